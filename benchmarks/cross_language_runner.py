@@ -8,32 +8,33 @@ Generates one random graph (CSR) and benchmarks:
   - C# native dijkstra
 Outputs JSON summary. Requires prior build of Rust, Go, C#.
 """
-import os, json, time, subprocess, random, math, statistics, argparse, tempfile, shutil, sys
+import os, time, subprocess, math, statistics, argparse, tempfile, shutil, sys
 from pathlib import Path
+import numpy as np
 
 # Assume python bindings available
 sys.path.append(str(Path(__file__).parent.parent / 'implementations' / 'python'))
 import rust_sssp  # type: ignore
 
+from _bench_common import dump_json  # type: ignore
+
 # Simple graph generator (match existing semantics loosely)
 def generate_random_graph(n: int, density: float, weight_range=(1.0,10.0), seed=0):
-    rnd = random.Random(seed)
+    rng = np.random.default_rng(seed)
     avg_out = density
-    edges = []
-    offsets = [0]
-    for u in range(n):
-        deg = max(1, int(rnd.expovariate(1/avg_out)))
-        targets = set()
-        for _ in range(deg):
-            v = rnd.randrange(n)
-            if v == u: continue
-            targets.add(v)
-        for v in targets:
-            w = rnd.uniform(*weight_range)
-            edges.append((v, w))
-        offsets.append(len(edges))
-    targets = [v for (v, _) in edges]
-    weights = [w for (_, w) in edges]
+    # per-node out-degree ~ floor(Exp(mean=avg_out)), at least 1 draw
+    deg = np.maximum(1, (rng.standard_exponential(n) * avg_out).astype(np.int64))
+    u = np.repeat(np.arange(n, dtype=np.int64), deg)
+    v = rng.integers(n, size=u.size, dtype=np.int64)
+    keep = u != v
+    # de-duplicate (u, v) pairs; np.unique also leaves keys in CSR order
+    key = np.unique(u[keep] * n + v[keep])
+    src = key // n
+    targets = (key % n).astype(np.uint32)
+    weights = rng.uniform(weight_range[0], weight_range[1], size=key.size).astype(np.float32)
+    offsets = np.empty(n + 1, dtype=np.uint32)
+    offsets[0] = 0
+    np.cumsum(np.bincount(src, minlength=n), out=offsets[1:], dtype=np.uint32)
     return offsets, targets, weights
 
 def run_rust(offsets, targets, weights, source, mode):
@@ -47,42 +48,55 @@ def run_rust(offsets, targets, weights, source, mode):
         raise ValueError(mode)
     return dist, pred, info
 
-def run_go(n, density, iterations, seed, verbose=False):
+# Build Go and C# benchmark binaries once, outside any timed region, so the
+# measured wall time excludes `go run` compilation and `dotnet build`.
+def _prebuild(build_dir):
     go_root = ROOT / 'implementations' / 'go'
-    cmd = ["go", "run", "./cmd/benchmark", "--nodes", str(n), "--density", str(density), "--iterations", str(iterations), "--seed", str(seed), "--verify", "false"]
-    start = time.time()
-    out = subprocess.check_output(cmd, cwd=go_root, stderr=subprocess.STDOUT, text=True)
-    elapsed = time.time() - start
-    # naive parse: last "Dijkstra Algorithm:" line in output
-    dijkstra_ms = None
-    for line in out.splitlines():
-        if "Dijkstra Algorithm:" in line:
-            try:
-                dijkstra_ms = float(line.split(':')[2].strip().split()[0])
-            except Exception:
-                pass
-    return {"elapsed_wall_s": elapsed, "parsed_dijkstra_ms": dijkstra_ms, "raw_output": out if verbose else None}
-
-def run_csharp(n, density, iterations, seed, verbose=False):
+    go_bin = Path(build_dir) / 'sssp_go'
+    subprocess.check_call(["go", "build", "-o", str(go_bin), "./cmd/benchmark"], cwd=go_root)
     cs_proj = ROOT/'implementations'/'csharp'
-    build_dir = cs_proj/'bin'/'Debug'
-    # build (debug) if not present
-    subprocess.check_call(["dotnet","build"], cwd=cs_proj)
-    exe = next((build_dir).rglob('*OptimizedSSSP.dll'), None)
-    if exe is None:
-        raise RuntimeError('Could not locate built C# dll')
-    cmd = ["dotnet", str(exe), "--nodes", str(n), "--density", str(density), "--iterations", str(iterations), "--seed", str(seed), "--verbose", "false"]
-    start = time.time()
-    out = subprocess.check_output(cmd, cwd=ROOT, stderr=subprocess.STDOUT, text=True)
-    elapsed = time.time() - start
+    cs_out = Path(build_dir) / 'csharp'
+    subprocess.check_call(["dotnet", "publish", "-c", "Release", "-o", str(cs_out)], cwd=cs_proj)
+    dll = next(cs_out.rglob('*OptimizedSSSP.dll'), None)
+    if dll is None:
+        raise RuntimeError('Could not locate published C# dll')
+    return {'go': go_bin, 'csharp': dll}
+
+# Run a prebuilt benchmark binary, streaming its output and parsing the first
+# "Dijkstra Algorithm:" line; output is only retained when verbose.
+def _run_and_parse(cmd, verbose=False):
+    start = time.perf_counter_ns()
+    p = subprocess.Popen(cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
     dijkstra_ms = None
-    for line in out.splitlines():
-        if "Dijkstra Algorithm:" in line:
+    lines = [] if verbose else None
+    for line in p.stdout:
+        if verbose:
+            lines.append(line)
+        if dijkstra_ms is None and "Dijkstra Algorithm:" in line:
             try:
                 dijkstra_ms = float(line.split(':')[2].strip().split()[0])
             except Exception:
-                pass
-    return {"elapsed_wall_s": elapsed, "parsed_dijkstra_ms": dijkstra_ms, "raw_output": out if verbose else None}
+                continue
+            if not verbose:
+                break
+    # drain remaining output without buffering it so the child never blocks on a full pipe
+    for _ in iter(lambda: p.stdout.read(65536), ''):
+        pass
+    rc = p.wait()
+    elapsed = (time.perf_counter_ns() - start) / 1e9
+    p.stdout.close()
+    out = ''.join(lines) if verbose else None
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, cmd, output=out)
+    return {"elapsed_wall_s": elapsed, "parsed_dijkstra_ms": dijkstra_ms, "raw_output": out}
+
+def run_go(binary, n, density, iterations, seed, verbose=False):
+    cmd = [str(binary), "--nodes", str(n), "--density", str(density), "--iterations", str(iterations), "--seed", str(seed), "--verify", "false"]
+    return _run_and_parse(cmd, verbose=verbose)
+
+def run_csharp(dll, n, density, iterations, seed, verbose=False):
+    cmd = ["dotnet", str(dll), "--nodes", str(n), "--density", str(density), "--iterations", str(iterations), "--seed", str(seed), "--verbose", "false"]
+    return _run_and_parse(cmd, verbose=verbose)
 
 ROOT = Path(__file__).resolve().parent.parent
 
@@ -101,9 +115,9 @@ def main():
 
     results = {}
     for mode in ['baseline','stoc','stoc_autotune']:
-        t0 = time.time()
+        t0 = time.perf_counter_ns()
         dist, pred, info = run_rust(offsets, targets, weights, source, mode)
-        dt = time.time() - t0
+        dt = (time.perf_counter_ns() - t0) / 1e9
         results[f'rust_{mode}'] = {
             'time_s': dt,
             'relaxations': info['relaxations'],
@@ -112,13 +126,17 @@ def main():
             'settled': info['settled'],
         }
     # Go & C# native runs (only dijkstra extracted)
-    go_res = run_go(args.nodes, args.density, args.iterations, args.seed, verbose=args.verbose)
-    cs_res = run_csharp(args.nodes, args.density, args.iterations, args.seed, verbose=args.verbose)
+    build_dir = tempfile.mkdtemp(prefix='sssp_xlang_')
+    try:
+        bins = _prebuild(build_dir)
+        go_res = run_go(bins['go'], args.nodes, args.density, args.iterations, args.seed, verbose=args.verbose)
+        cs_res = run_csharp(bins['csharp'], args.nodes, args.density, args.iterations, args.seed, verbose=args.verbose)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
     results['go_dijkstra'] = go_res
     results['csharp_dijkstra'] = cs_res
 
-    with open(args.output,'w') as f:
-        json.dump({'config': vars(args), 'results': results, 'timestamp': time.time()}, f, indent=2)
+    dump_json(args.output, {'config': vars(args), 'results': results, 'timestamp': time.time()})
     print(f"Wrote results to {args.output}")
 
 if __name__ == '__main__':
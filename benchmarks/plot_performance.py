@@ -4,50 +4,62 @@ Produces benchmarks/performance.png showing baseline vs STOC (fixed δ) vs STOC
 
 Designed to scale optionally to large n (e.g. 1,000,000) while keeping CI runs bounded via --ci-max-n.
 """
-import math, random, time, statistics, argparse, json, os
+import math, time, argparse, os
 from pathlib import Path
 import sys
+import numpy as np
 ROOT=Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT/'implementations'/'python'))
 import rust_sssp  # type: ignore
 
-def gen_graph(n,density,seed):
-    rnd=random.Random(seed)
+from _bench_common import dump_json  # type: ignore
+
+def _gen_into(u,v,w,n,seed):
+    # Fill caller-owned u/v/w buffers in place: ints are scaled from uniform
+    # floats drawn into w, so no per-call draw temporaries are allocated.
+    rng=np.random.default_rng(seed)
+    rng.random(out=w); w*=n; u[...]=w
+    rng.random(out=w); w*=n; v[...]=w
+    rng.random(out=w); w*=9; w+=1
+
+def alloc_scratch(max_m):
+    # u/v in the Rust ABI index dtype; w stays float64 as the draw buffer
+    return np.empty(max_m,np.uint32),np.empty(max_m,np.uint32),np.empty(max_m,np.float64)
+
+def gen_graph(n,density,seed,scratch=None):
     m=int(density*n)
-    adj=[[] for _ in range(n)]
-    for _ in range(m):
-        u=rnd.randrange(n); v=rnd.randrange(n)
-        if u==v: continue
-        w=rnd.random()*9+1
-        adj[u].append((v,w))
-    offs=[0]; tg=[]; wt=[]
-    for u in range(n):
-        for v,w in adj[u]:
-            tg.append(v); wt.append(w)
-        offs.append(len(tg))
+    u_buf,v_buf,w_buf=scratch if scratch is not None else alloc_scratch(m)
+    u,v,w=u_buf[:m],v_buf[:m],w_buf[:m]
+    _gen_into(u,v,w,n,seed)
+    keep=u!=v
+    u,v,w=u[keep],v[keep],w[keep]
+    order=np.argsort(u,kind='stable')
+    tg=v[order]; wt=w[order].astype(np.float32)
+    deg=np.bincount(u,minlength=n)
+    offs=np.empty(n+1,dtype=np.uint32); offs[0]=0
+    np.cumsum(deg,out=offs[1:],dtype=np.uint32)
     return offs,tg,wt
 
-def measure(offs,tg,wt,mode, autotune_env=None):
+def pick_source(offs,tg,wt,min_reach=0.5,max_tries=64):
+    # Sparse random digraphs leave some nodes in tiny out-components; timing
+    # from one of those measures almost nothing. Take the first node whose
+    # reachable set covers at least min_reach of the graph.
+    n=offs.size-1
+    for src in range(min(n,max_tries)):
+        dist,_,_=rust_sssp.run_baseline(offs,tg,wt,src)
+        reached=int(np.isfinite(dist).sum())
+        if reached>=min_reach*n:
+            return src,reached
+    raise RuntimeError(f'no source in the first {max_tries} nodes reaches {min_reach:.0%} of n={n}')
+
+def measure(offs,tg,wt,mode,src=0,autotune_set=None,autotune_limit=None):
     t0=time.perf_counter()
     if mode=='baseline':
-        rust_sssp.run_baseline(offs,tg,wt,0)
+        rust_sssp.run_baseline(offs,tg,wt,src)
     elif mode=='stoc':
-        rust_sssp.run_stoc(offs,tg,wt,0)
+        rust_sssp.run_stoc(offs,tg,wt,src)
     elif mode=='stoc_autotune':
-        backup={}
-        if autotune_env:
-            for k,v in autotune_env.items():
-                backup[k]=os.environ.get(k)
-                os.environ[k]=v
-        try:
-            rust_sssp.run_stoc_autotune(offs,tg,wt,0)
-        finally:
-            if autotune_env:
-                for k,old in backup.items():
-                    if old is None:
-                        os.environ.pop(k, None)
-                    else:
-                        os.environ[k]=old
+        rust_sssp.run_stoc_autotune(offs,tg,wt,src,autotune_set=autotune_set,autotune_limit=autotune_limit)
     else:
         raise ValueError(mode)
     return time.perf_counter()-t0
@@ -59,12 +71,14 @@ def main():
     ap.add_argument('--repeat',type=int,default=2)
     ap.add_argument('--output',default='benchmarks/performance.png')
     ap.add_argument('--no-autotune',action='store_true',help='Skip autotune series')
-    ap.add_argument('--autotune-set',default='0.5,1,2,4',help='Comma list passed to SSSP_STOC_AUTOTUNE_SET')
-    ap.add_argument('--autotune-limit',default='20000',help='Value for SSSP_STOC_AUTOTUNE_LIMIT (truncation)')
+    ap.add_argument('--autotune-set',default='0.5,1,2,4',help='Comma list of autotune delta multipliers')
+    ap.add_argument('--autotune-limit',type=int,default=20000,help='Autotune trial settle cap (truncation)')
     ap.add_argument('--ci-max-n',type=int,default=128000,help='Cap max n when CI env detected')
     ap.add_argument('--annotate-heavy',action='store_true',help='Annotate heavy edge ratio (STOC) vs n on secondary axis')
     args=ap.parse_args()
     try:
+        import matplotlib
+        matplotlib.use('Agg')  # file output only; no GUI backend startup
         import matplotlib.pyplot as plt
     except ImportError:
         print('matplotlib required')
@@ -75,40 +89,46 @@ def main():
         if not sizes:
             sizes=[args.ci_max_n]
     rows=[]
-    do_autotune = (not args.no_autotune) and hasattr(rust_sssp,'run_stoc_autotune')
-    autotune_env={'SSSP_STOC_AUTOTUNE_SET':args.autotune_set,'SSSP_STOC_AUTOTUNE_LIMIT':args.autotune_limit}
-    for n in sizes:
-        offs,tg,wt=gen_graph(n,args.density,12345)
-        b=[measure(offs,tg,wt,'baseline') for _ in range(args.repeat)]
-        s=[measure(offs,tg,wt,'stoc') for _ in range(args.repeat)]
-        a=[]
-        if do_autotune:
-            # Autotune more expensive; single measurement usually fine, but honor repeat if >1.
-            a=[measure(offs,tg,wt,'stoc_autotune',autotune_env=autotune_env) for _ in range(max(1,args.repeat))]
-        bt=statistics.median(b); st=statistics.median(s); at=statistics.median(a) if a else None
-        m=offs[-1]; logn=math.log(n)
+    # every autotune call passes autotune_set/autotune_limit, which need the _ex symbol
+    do_autotune = (not args.no_autotune) and rust_sssp.has_variant('run_stoc_autotune_ex')
+    autotune_set=[float(x) for x in args.autotune_set.split(',') if x.strip()]
+    # draw buffers sized for the largest n, sliced per size
+    scratch=alloc_scratch(int(args.density*max(sizes)))
+    # Raw timing samples, one row per size; written to a separate .npz rather than the summary JSON.
+    # Autotune more expensive; single measurement usually fine, but honor repeat if >1.
+    samples={'baseline':np.empty((len(sizes),args.repeat)),'stoc':np.empty((len(sizes),args.repeat)),
+             'autotune':np.empty((len(sizes),max(1,args.repeat) if do_autotune else 0))}
+    for i,n in enumerate(sizes):
+        offs,tg,wt=gen_graph(n,args.density,12345,scratch)
+        src,reached=pick_source(offs,tg,wt)
+        b=samples['baseline'][i]; s=samples['stoc'][i]; a=samples['autotune'][i]
+        for k in range(b.size):
+            b[k]=measure(offs,tg,wt,'baseline',src)
+        for k in range(s.size):
+            s[k]=measure(offs,tg,wt,'stoc',src)
+        for k in range(a.size):
+            a[k]=measure(offs,tg,wt,'stoc_autotune',src,autotune_set=autotune_set,autotune_limit=args.autotune_limit)
+        bt=float(np.median(b)); st=float(np.median(s)); at=float(np.median(a)) if a.size else None
+        m=int(offs[-1]); logn=math.log(n)
         # Per-series stats for error bars
-        row={'n':n,'m':m,'baseline_s':bt,'stoc_s':st,'stoc_autotune_s':at,'baseline_samples':b,'stoc_samples':s,'autotune_samples':a,'mlogn':m*logn,'mlog23':m*(logn**(2/3))}
-        # Attempt to pull bucket stats via FFI if available
-        try:
-            import rust_sssp as rs
-            stats = rs.get_bucket_stats() if hasattr(rs,'get_bucket_stats') else None
-            if stats:
-                row['bucket_stats']=stats
-            bh = rs.get_baseline_heap_stats() if hasattr(rs,'get_baseline_heap_stats') else None
-            if bh:
-                row['baseline_heap']=bh
-        except Exception:
-            pass
+        row={'n':n,'m':m,'source':src,'reached':reached,'baseline_s':bt,'stoc_s':st,'stoc_autotune_s':at,'mlogn':m*logn,'mlog23':m*(logn**(2/3))}
+        # Bucket / heap stats via FFI (None when the library lacks the getter)
+        stats = rust_sssp.get_bucket_stats()
+        if stats:
+            row['bucket_stats']=stats
+        bh = rust_sssp.get_baseline_heap_stats()
+        if bh:
+            row['baseline_heap']=bh
         rows.append(row)
         if at is not None:
             print(f"n={n} baseline {bt*1000:.2f}ms stoc {st*1000:.2f}ms stoc_autotune {at*1000:.2f}ms")
         else:
             print(f"n={n} baseline {bt*1000:.2f}ms stoc {st*1000:.2f}ms")
-    # Normalize theoretical curves to first baseline point for visibility
+    # Scale theoretical curves by the median time/term ratio over all sizes,
+    # so a single noisy (or small) first point cannot skew them
     if rows:
-        k_base=rows[0]['baseline_s']/rows[0]['mlogn']
-        k_stoc=rows[0]['stoc_s']/rows[0]['mlog23']
+        k_base=float(np.median([r['baseline_s']/r['mlogn'] for r in rows]))
+        k_stoc=float(np.median([r['stoc_s']/r['mlog23'] for r in rows]))
     x=[r['n'] for r in rows]
     bcurve=[r['baseline_s'] for r in rows]
     scurve=[r['stoc_s'] for r in rows]
@@ -118,17 +138,10 @@ def main():
     fig, ax1 = plt.subplots(figsize=(8,5))
     # Error bars (std dev) for baseline and stoc
     def series_mean_std(key):
-        means=[]; stds=[]
-        for r in rows:
-            samples=r.get(key+'_samples',[])
-            if len(samples)>1:
-                means.append(sum(samples)/len(samples))
-                stds.append(statistics.pstdev(samples))
-            elif len(samples)==1:
-                means.append(samples[0]); stds.append(0.0)
-            else:
-                means.append(float('nan')); stds.append(0.0)
-        return means,stds
+        mat=samples[key]
+        if not mat.shape[1]:
+            return np.full(len(rows),np.nan),np.zeros(len(rows))
+        return mat.mean(axis=1),mat.std(axis=1,ddof=0)
     bmeans, bstds = series_mean_std('baseline')
     smeans, sstds = series_mean_std('stoc')
     ax1.errorbar(x,bmeans,yerr=bstds,fmt='o-',capsize=3,label='Baseline (mean±σ)')
@@ -181,8 +194,9 @@ def main():
                 r['baseline_norm_heap'] = None
             else:
                 r['baseline_norm_heap'] = r['baseline_s'] / (denom * lg)
-    with open('benchmarks/performance_data.json','w') as f:
-        json.dump(rows,f,indent=2)
+    # Compact per-size summary (medians) + raw samples as a compressed binary side file
+    dump_json('benchmarks/performance_data.json',rows,indent=False)
+    np.savez_compressed('benchmarks/performance_samples.npz',n=np.array(sizes),**samples)
     print(f"Wrote {args.output}")
 
 if __name__=='__main__':
@@ -4,36 +4,13 @@ Generates synthetic graphs increasing n, fixed density d, measures m=|E| and tim
 Fits time against: m * log(n)**(2/3) (STOC target) vs m * log(n) (baseline expected) using linear regression of constant factors.
 Outputs JSON + printed ratios.
 """
-import math, time, random, argparse, json, statistics, sys, os
+import math, argparse, statistics, sys
+import numpy as np
 from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT / 'implementations' / 'python'))
 import rust_sssp  # type: ignore
-
-def generate_graph(n:int, density:float, seed:int):
-    rnd = random.Random(seed)
-    target_edges = int(density * n)
-    adj = [[] for _ in range(n)]
-    for _ in range(target_edges):
-        u = rnd.randrange(n); v = rnd.randrange(n)
-        if u==v: continue
-        w = rnd.random()*9+1
-        adj[u].append((v,w))
-    offsets=[0]; targets=[]; weights=[]
-    for u in range(n):
-        for v,w in adj[u]:
-            targets.append(v); weights.append(w)
-        offsets.append(len(targets))
-    return offsets, targets, weights
-
-def measure(offsets,targets,weights,mode):
-    src=0
-    t0=time.perf_counter()
-    if mode=='baseline':
-        rust_sssp.run_baseline(offsets,targets,weights,src)
-    else:
-        rust_sssp.run_stoc(offsets,targets,weights,src)
-    return (time.perf_counter()-t0)
+from _bench_common import run_grid, dump_json  # type: ignore
 
 def main():
     ap=argparse.ArgumentParser()
@@ -45,12 +22,10 @@ def main():
     args=ap.parse_args()
     sizes=[int(s) for s in args.sizes.split(',') if s]
     rows=[]
-    for n in sizes:
-        offsets,targets,weights=generate_graph(n,args.density,args.seed)
-        m=offsets[-1]
-        base_times=[measure(offsets,targets,weights,'baseline') for _ in range(args.repeat)]
-        stoc_times=[measure(offsets,targets,weights,'stoc') for _ in range(args.repeat)]
-        bt=statistics.median(base_times); st=statistics.median(stoc_times)
+    grid=run_grid({'baseline':rust_sssp.run_baseline,'stoc':rust_sssp.run_stoc},sizes,args.repeat,args.density,args.seed)
+    for i,n in enumerate(sizes):
+        m=int(grid['m'][i])
+        bt=float(np.median(grid['baseline'][i])); st=float(np.median(grid['stoc'][i]))
         logn=math.log(n)
         metric_log= m*logn
         metric_stoc = m*(logn**(2/3))
@@ -61,7 +36,7 @@ def main():
             'stoc_time_per_mlog23': st/metric_stoc if metric_stoc>0 else None
         })
         print(f"n={n} m={m} baseline={bt*1000:.2f}ms stoc={st*1000:.2f}ms")
-    with open(args.output,'w') as f: json.dump(rows,f,indent=2)
+    dump_json(args.output,rows)
     # Simple factor stability summary
     print('\nFactor stability:')
     b_factors=[r['baseline_time_per_mlogn'] for r in rows if r['baseline_time_per_mlogn']]
@@ -4,43 +4,83 @@ Runs multiple repetitions over a grid of (n, density) values, captures timing
 statistics (median, mean, stdev, min, max) and speedup distribution.
 Outputs JSON + heatmap of median speedup.
 """
-import time, math, random, json, argparse, statistics, os
+import time, math, json, argparse, os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import numpy as np
 import sys
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.append(str(ROOT / 'implementations' / 'python'))
 import rust_sssp  # type: ignore
+from _bench_common import generate_graph_csr, NUMBA_EDGE_THRESHOLD  # type: ignore
 
-# Graph generator (same as other benchmarks for consistency)
-def generate_graph(n:int, density:float, seed:int):
-    rnd = random.Random(seed)
-    target_edges = int(density * n)
-    adj = [[] for _ in range(n)]
-    for _ in range(target_edges):
-        u = rnd.randrange(n); v = rnd.randrange(n)
-        if u==v: continue
-        w = rnd.random()*9+1
-        adj[u].append((v,w))
-    offsets=[0]; targets=[]; weights=[]
-    for u in range(n):
-        for v,w in adj[u]:
-            targets.append(v); weights.append(w)
-        offsets.append(len(targets))
-    return offsets, targets, weights
-
-def time_variant(fn, offsets, targets, weights, src):
-    t0 = time.perf_counter(); fn(offsets, targets, weights, src); return (time.perf_counter()-t0)*1000.0
+try:
+    import numba  # type: ignore
+except ImportError:  # optional: NumPy statistics are used instead
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _stats(arr):
+        return np.median(arr), np.mean(arr), np.std(arr), np.min(arr), np.max(arr)
+
+def time_variant(fn, offsets, targets, weights, src, buffers=None):
+    t0 = time.perf_counter(); fn(offsets, targets, weights, src, buffers=buffers); return (time.perf_counter()-t0)*1000.0
+
+# Cells with at least this many expected edges are farmed out to worker
+# processes; below it a Rust call is too short to amortize the IPC round trip
+PARALLEL_EDGE_THRESHOLD = 200_000
+
+# Per-process output/staging buffers, grown to the largest n seen and reused across reps and cells
+_BUFFERS = {'baseline': rust_sssp.CsrBuffers(), 'spec': rust_sssp.CsrBuffers()}
+
+def _init_worker():
+    # One Numba thread per worker: the pool already spreads cells over the cores
+    os.environ['NUMBA_NUM_THREADS'] = '1'
+    if numba is not None:
+        numba.set_num_threads(1)
+
+def run_cell(n:int, d:float, seed:int, reps:int, regen_per_rep:bool=False):
+    """Time `reps` baseline/spec_clean runs on one (n, density) cell.
+
+    Top-level so it can be shipped to a worker process; returns
+    (baseline_ms, spec_ms) lists, spec entries are nan without spec_clean.
+    """
+    has_spec = rust_sssp.has_variant('run_spec_clean')
+    base_buf = _BUFFERS['baseline']; spec_buf = _BUFFERS['spec']
+    base_times=[]; spec_times=[]
+    # Cycle a small pool of graphs per cell so generation costs ~reps/4
+    # builds rather than reps; regen_per_rep restores one graph per rep
+    n_graphs = reps if regen_per_rep else max(1, reps//4)
+    # With several Numba threads (serial run in the parent) every cell is built
+    # by the parallel kernel; pool workers are pinned to one thread, where the
+    # NumPy path is slightly faster. Both produce the same graph.
+    min_edges = 0 if numba is not None and numba.get_num_threads() > 1 else NUMBA_EDGE_THRESHOLD
+    graphs = [generate_graph_csr(n,d, seed=seed + g, numba_min_edges=min_edges) for g in range(n_graphs)]
+    src=0
+    # Untimed warm-up so the library's first-call allocations are not measured
+    rust_sssp.run_baseline(*graphs[0], src, buffers=base_buf)
+    if has_spec:
+        rust_sssp.run_spec_clean(*graphs[0], src, buffers=spec_buf)
+    for r in range(reps):
+        offsets,targets,weights = graphs[r % n_graphs]
+        tb = time_variant(rust_sssp.run_baseline, offsets, targets, weights, src, base_buf)
+        if has_spec:
+            ts = time_variant(rust_sssp.run_spec_clean, offsets, targets, weights, src, spec_buf)
+        else:
+            ts = float('nan')
+        base_times.append(tb); spec_times.append(ts)
+    return base_times, spec_times
 
 def stats(values):
-    return {
-        'n': len(values),
-        'median': statistics.median(values),
-        'mean': statistics.fmean(values),
-        'stdev': statistics.pstdev(values) if len(values)>1 else 0.0,
-        'min': min(values),
-        'max': max(values)
-    }
+    a = np.asarray(values, dtype=np.float64)
+    if numba is not None and a.size > 0:
+        med, mean, sd, mn, mx = _stats(a)
+    else:
+        mn, med, mx = np.percentile(a, [0, 50, 100]); mean = a.mean(); sd = a.std()
+    return {'n': int(a.size), 'median': float(med), 'mean': float(mean), 'stdev': float(sd),
+            'min': float(mn), 'max': float(mx)}
 
 def main():
     ap = argparse.ArgumentParser()
@@ -50,41 +90,50 @@ def main():
     ap.add_argument('--seed', type=int, default=42)
     ap.add_argument('--output', default='stat_benchmark.json')
     ap.add_argument('--heatmap', default='stat_speedup_heatmap.png')
+    ap.add_argument('--regen-per-rep', action='store_true',
+                    help='generate a fresh graph every repetition instead of cycling a small pool per cell')
+    ap.add_argument('--workers', type=int, default=1,
+                    help=f'worker processes for cells with >= {PARALLEL_EDGE_THRESHOLD} expected edges (default 1 = serial; '
+                         'concurrent cells contend for cores and memory bandwidth, so timings are noisier)')
     args = ap.parse_args()
 
     sizes=[int(s) for s in args.sizes.split(',') if s]
     densities=[float(d) for d in args.densities.split(',') if d]
 
     grid_results=[]
-    speedup_matrix = np.zeros((len(sizes), len(densities)))
-
-    for i,n in enumerate(sizes):
-        for j,d in enumerate(densities):
-            base_times=[]; spec_times=[]
-            # Re-generate graph each repetition (captures noise); could reuse to isolate algorithmic variance
-            for r in range(args.reps):
-                offsets,targets,weights = generate_graph(n,d, seed=args.seed + r)
-                src=0
-                tb = time_variant(rust_sssp.run_baseline, offsets, targets, weights, src)
-                if rust_sssp._HAS_SPEC_CLEAN:
-                    ts = time_variant(rust_sssp.run_spec_clean, offsets, targets, weights, src)
-                else:
-                    ts = float('nan')
-                base_times.append(tb); spec_times.append(ts)
-            b_stats = stats(base_times); s_stats = stats(spec_times)
-            # Per-repetition speedups
-            speedups = [ (b/s) if s>0 else float('nan') for b,s in zip(base_times,spec_times) ]
-            speedup_stats = stats(speedups)
-            speedup_matrix[i,j] = speedup_stats['median']
-            grid_results.append({
-                'n': n,
-                'density': d,
-                'baseline': b_stats,
-                'spec': s_stats,
-                'speedup': speedup_stats,
-                'raw': {'baseline_ms': base_times, 'spec_ms': spec_times, 'speedup': speedups}
-            })
-            print(f"n={n} d={d} base_med={b_stats['median']:.2f}ms spec_med={s_stats['median']:.2f}ms spd_med={speedup_stats['median']:.3f}x")
+    # Cells not filled (or without spec_clean) stay nan and render blank in the heatmap
+    speedup_matrix = np.full((len(sizes), len(densities)), np.nan, dtype=np.float32)
+    cells = [(i,j,n,d) for i,n in enumerate(sizes) for j,d in enumerate(densities)]
+    big = [c for c in cells if args.workers > 1 and c[2]*c[3] >= PARALLEL_EDGE_THRESHOLD]
+
+    # Small cells are timed first, alone; only then are large cells handed to
+    # the pool, so no inline timing overlaps a worker's.
+    # spawn rather than fork: Numba's threading layer is not fork-safe.
+    times = {(i,j): run_cell(n, d, args.seed, args.reps, args.regen_per_rep) for i,j,n,d in cells if (i,j,n,d) not in big}
+    if big:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(big)), initializer=_init_worker,
+                                 mp_context=multiprocessing.get_context('spawn')) as ex:
+            futs = {(i,j): ex.submit(run_cell, n, d, args.seed, args.reps, args.regen_per_rep) for i,j,n,d in big}
+            for key, fut in futs.items():
+                times[key] = fut.result()
+    for i,j,n,d in cells:
+        base_times, spec_times = times[(i,j)]
+        b_stats = stats(base_times); s_stats = stats(spec_times)
+        # Per-repetition speedups
+        bt = np.asarray(base_times); st = np.asarray(spec_times)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            speedups = np.where(st > 0, bt / st, np.nan)
+        speedup_matrix[i,j] = np.median(speedups)
+        speedup_stats = stats(speedups)
+        grid_results.append({
+            'n': n,
+            'density': d,
+            'baseline': b_stats,
+            'spec': s_stats,
+            'speedup': speedup_stats,
+            'raw': {'baseline_ms': base_times, 'spec_ms': spec_times, 'speedup': speedups.tolist()}
+        })
+        print(f"n={n} d={d} base_med={b_stats['median']:.2f}ms spec_med={s_stats['median']:.2f}ms spd_med={speedup_stats['median']:.3f}x")
 
     payload = {
         'config': vars(args),
@@ -0,0 +1,189 @@
+"""Shared pieces of the Python benchmark drivers: the CSR graph generator,
+a (variant x size x repeat) timing loop and JSON output."""
+import time
+import json
+import functools
+import numpy as np
+from rust_sssp import CsrBuffers, alloc_large
+
+try:
+    import numba  # type: ignore
+except ImportError:  # optional: NumPy generator is used instead
+    numba = None
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+def dump_json(path, obj, indent=True):
+    # orjson encodes NumPy arrays/scalars natively; the json fallback converts them via tolist()
+    if orjson is not None:
+        opt = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=opt))
+    else:
+        with open(path, 'w') as f:
+            json.dump(obj, f, indent=2 if indent else None, default=lambda o: o.tolist())
+
+
+# Both generator paths hash edge i from (seed, i) with the same splitmix64
+# stream, so a given (n, density, seed) yields the same graph whichever runs;
+# the Numba kernel is only a faster way to build it. Edge count above which
+# generate_graph_csr uses the kernel (if available):
+NUMBA_EDGE_THRESHOLD = 1_000_000
+# Cap on per-chunk degree counters: memory is NUMBA_MAX_CHUNKS * n * 4 bytes
+NUMBA_MAX_CHUNKS = 8
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_INV_2_53 = 1.0 / 9007199254740992.0
+
+def _mix64_np(x):
+    # In-place splitmix64 finalizer on a uint64 array; mirrors _mix64
+    x ^= x >> np.uint64(30); x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27); x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+def _edges_np(n, m, seed, weight_low, weight_high):
+    # Vectorized _edge over i in [0, m): (u, v, w) in the same stream as the kernel
+    base = np.arange(m, dtype=np.uint64)
+    base *= np.uint64(3)
+    base += np.uint64((seed * _GOLDEN) & 0xFFFFFFFFFFFFFFFF)  # Python int: wraps like the kernel, no overflow warning
+    u = (_mix64_np(base.copy()) >> np.uint64(32)) * np.uint64(n) >> np.uint64(32)
+    base += np.uint64(1)
+    v = (_mix64_np(base.copy()) >> np.uint64(32)) * np.uint64(n) >> np.uint64(32)
+    base += np.uint64(1)
+    w = weight_low + (weight_high - weight_low) * ((_mix64_np(base) >> np.uint64(11)) * _INV_2_53)
+    return u.astype(np.uint32), v.astype(np.uint32), w.astype(np.float32)
+
+if numba is not None:
+    @numba.njit(cache=True, inline='always')
+    def _mix64(x):
+        # splitmix64 finalizer: stateless, so edge i is reproducible from (seed, i)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+    @numba.njit(cache=True, inline='always')
+    def _edge(i, n, seed, weight_low, weight_span):
+        base = np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15) + np.uint64(3) * np.uint64(i)
+        a = np.int64((_mix64(base) >> np.uint64(32)) * np.uint64(n) >> np.uint64(32))
+        b = np.int64((_mix64(base + np.uint64(1)) >> np.uint64(32)) * np.uint64(n) >> np.uint64(32))
+        w = weight_low + weight_span * ((_mix64(base + np.uint64(2)) >> np.uint64(11)) * (1.0 / 9007199254740992.0))
+        return a, b, w
+
+    @numba.njit(parallel=True, cache=True)
+    def _gen_graph_numba(n, m, weight_low, weight_high, seed, nchunks, targets_buf, weights_buf):
+        # Two-pass counting-sort CSR build. Edge i is a pure function of
+        # (seed, i), so pass 2 regenerates pass 1's stream and no O(m) u/v/w
+        # temporaries are kept. Per-chunk counters give each chunk its own
+        # write cursor per source: stable edge order, no atomics.
+        span = weight_high - weight_low
+        chunk = (m + nchunks - 1) // nchunks
+        counts = np.zeros((nchunks, n), np.int32)
+        for c in numba.prange(nchunks):
+            for i in range(c * chunk, min(m, (c + 1) * chunk)):
+                a, b, _ = _edge(i, n, seed, weight_low, span)
+                if a != b:
+                    counts[c, a] += 1
+        deg = np.zeros(n, np.int64)
+        for x in numba.prange(n):
+            acc = 0
+            for c in range(nchunks):
+                k = counts[c, x]; counts[c, x] = acc; acc += k
+            deg[x] = acc
+        offsets = np.zeros(n + 1, np.int64)
+        offsets[1:] = np.cumsum(deg)
+        # Caller-provided buffers of capacity m (self-loops only shrink the count)
+        targets = targets_buf[:offsets[n]]
+        weights = weights_buf[:offsets[n]]
+        for c in numba.prange(nchunks):
+            for i in range(c * chunk, min(m, (c + 1) * chunk)):
+                a, b, wt = _edge(i, n, seed, weight_low, span)
+                if a != b:
+                    pos = offsets[a] + counts[c, a]; counts[c, a] += 1
+                    targets[pos] = b; weights[pos] = wt
+        # Sort each adjacency by target to match the NumPy path's lexsort layout
+        for x in numba.prange(n):
+            lo = offsets[x]; hi = offsets[x + 1]
+            if hi - lo > 1:
+                order = np.argsort(targets[lo:hi], kind='mergesort')
+                targets[lo:hi] = targets[lo:hi][order]
+                weights[lo:hi] = weights[lo:hi][order]
+        return offsets, targets, weights
+
+
+# Simple random graph generator (uniform) producing CSR arrays in the Rust
+# ABI dtypes (uint32 offsets/targets, float32 weights)
+# Nodes are 0..n-1; expected edges ~ density * n
+
+def generate_graph_csr(n: int, density: float, seed=12345, weight_low=1.0, weight_high=10.0,
+                       numba_min_edges=NUMBA_EDGE_THRESHOLD):
+    # approximate m; draw all edges at once and drop self-loops.
+    # numba_min_edges only picks the implementation, never the graph.
+    target_edges = int(density * n)
+    if numba is not None and target_edges > numba_min_edges:
+        nchunks = min(numba.get_num_threads(), NUMBA_MAX_CHUNKS)
+        offsets, targets, weights = _gen_graph_numba(n, target_edges, weight_low, weight_high, seed, nchunks,
+                                                     alloc_large(target_edges, np.uint32), alloc_large(target_edges, np.float32))
+        out = alloc_large(n + 1, np.uint32)
+        out[:] = offsets
+        return out, targets, weights
+    u, v, w = _edges_np(n, target_edges, seed, weight_low, weight_high)
+    keep = u != v
+    u, v, w = u[keep], v[keep], w[keep]
+    # CSR: order by source, then by target within each adjacency, repeated
+    # (u, v) pairs in draw order as in the kernel. One argsort on a composite
+    # u*n+v key is several times faster than lexsort((v, u)); appending the
+    # draw index makes keys unique so the cheaper unstable sort can be used
+    # (~3x faster than kind='stable') whenever the key fits in 64 bits.
+    idx_bits = u.size.bit_length()
+    if (n * n) << idx_bits <= 1 << 64:
+        key = (u.astype(np.uint64) * np.uint64(n) + v) << np.uint64(idx_bits)
+        key |= np.arange(u.size, dtype=np.uint64)
+        order = np.argsort(key)
+    else:
+        order = np.argsort(u.astype(np.int64) * n + v, kind='stable')
+    # Outputs are the arrays Rust streams, so they go in huge-page-advised memory
+    targets = np.take(v, order, out=alloc_large(u.size, np.uint32))
+    weights = np.take(w, order, out=alloc_large(u.size, np.float32))
+    deg = np.bincount(u, minlength=n)
+    offsets = alloc_large(n + 1, np.uint32)
+    offsets[0] = 0
+    np.cumsum(deg, out=offsets[1:], dtype=np.uint32)
+    return offsets, targets, weights
+
+
+@functools.lru_cache(maxsize=32)
+def gen_cached(n: int, density: float, seed: int):
+    # Memoized per (n, density, seed) so repeated sweeps skip regeneration;
+    # arrays are shared between callers, hence read-only. Bounded so a long
+    # sweep of large sizes does not pin every graph it ever built.
+    offsets, targets, weights = generate_graph_csr(n, density, seed)
+    for arr in (offsets, targets, weights):
+        arr.setflags(write=False)
+    return offsets, targets, weights
+
+
+def run_grid(variants, sizes, reps, density=2.0, seed=12345, src=0):
+    """Time each variant `reps` times on one generated graph per size.
+
+    `variants` maps a name to a run_*-style callable. Returns
+    ``{'n': sizes, 'm': edge counts, <name>: (len(sizes), reps) seconds}``.
+    Each variant gets its own output buffer pool, reused across the sweep.
+    """
+    out = {'n': np.asarray(sizes, dtype=np.int64), 'm': np.empty(len(sizes), dtype=np.int64)}
+    for name in variants:
+        out[name] = np.empty((len(sizes), reps))
+    buffers = {name: CsrBuffers() for name in variants}
+    for i, n in enumerate(sizes):
+        offsets, targets, weights = gen_cached(n, density, seed)
+        out['m'][i] = offsets[-1]
+        for name, fn in variants.items():
+            row = out[name][i]; buf = buffers[name]
+            for k in range(reps):
+                t0 = time.perf_counter()
+                fn(offsets, targets, weights, src, buffers=buf)
+                row[k] = time.perf_counter() - t0
+    return out
@@ -1,72 +1,92 @@
-import random
 import time
 import math
 import argparse
-import json
-from rust_sssp import run_baseline, _HAS_SPEC_CLEAN, run_spec_clean
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from rust_sssp import run_baseline, run_spec_clean, has_variant, CsrBuffers
 from rust_sssp import get_baseline_heap_stats, get_spec_heap_stats  # added
+from _bench_common import gen_cached, dump_json
 
-# Simple random graph generator (uniform) producing CSR arrays
-# Nodes are 0..n-1; expected edges ~ density * n
-
-def generate_graph(n: int, density: float, weight_low=1.0, weight_high=10.0, seed=12345):
-    rng = random.Random(seed)
-    # approximate m
-    target_edges = int(density * n)
-    # build adjacency lists first
-    adj = [[] for _ in range(n)]
-    for _ in range(target_edges):
-        u = rng.randrange(n)
-        v = rng.randrange(n)
-        if u == v:
-            continue
-        w = rng.uniform(weight_low, weight_high)
-        adj[u].append((v, w))
-    # CSR
-    offsets = [0]
-    targets = []
-    weights = []
-    for u in range(n):
-        # optionally sort targets for locality
-        if adj[u]:
-            adj[u].sort(key=lambda x: x[0])
-        for (v, w) in adj[u]:
-            targets.append(v)
-            weights.append(w)
-        offsets.append(len(targets))
-    return offsets, targets, weights
-
-
-def run_trial(n, density, seed, verify_spec=True):
-    offsets, targets, weights = generate_graph(n, density, seed=seed)
-    src = 0
+try:
+    import numba  # type: ignore
+except ImportError:  # optional: NumPy parity check is used instead
+    numba = None
+
+# Probed once at import; run_trial only calls what the loaded library provides
+_HAS = {name: has_variant(name) for name in ('run_baseline', 'run_spec_clean')}
+
+# Per-variant output buffers, reused across trials (one pool per variant so
+# parallel runs never share storage)
+_BUFFERS = {'baseline': CsrBuffers(), 'spec': CsrBuffers()}
+
+# Unreachable nodes hold the exact +inf sentinel from Rust, so two unreachable
+# entries compare equal and no isinf/isfinite test is needed: a pair mismatches
+# iff the values differ and are not within tol (inf vs finite never is).
+def _mismatch_mask(db, ds, tol):
+    with np.errstate(invalid='ignore'):  # inf - inf -> nan, already excluded by db != ds
+        return (db != ds) & ~(np.abs(db - ds) <= tol)
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _parity_check(db, ds, tol):
+        # Single pass, no temporaries
+        bad = 0
+        for i in range(db.size):
+            a = db[i]; b = ds[i]
+            if a != b and not abs(a - b) <= tol:
+                bad += 1
+        return bad
+else:
+    def _parity_check(db, ds, tol):
+        return int(np.count_nonzero(_mismatch_mask(db, ds, tol)))
+
+
+def _timed(fn, offsets, targets, weights, src, buffers=None, return_arrays=True):
     t0 = time.perf_counter()
-    dist_b, pred_b, stats_b = run_baseline(offsets, targets, weights, src)
-    t1 = time.perf_counter()
+    out = fn(offsets, targets, weights, src, buffers=buffers, return_arrays=return_arrays)
+    return out, time.perf_counter() - t0
+
+
+def run_trial(n, density, offsets, targets, weights, verify_spec=True, parallel=False):
+    src = 0
+    variants = {'baseline': run_baseline}
+    if _HAS['run_spec_clean']:
+        variants['spec'] = run_spec_clean
+    # dist/pred are only read by the parity check
+    want_arrays = verify_spec and 'spec' in variants
+    if parallel:
+        # ctypes releases the GIL for the duration of each Rust call, so the
+        # variants run truly concurrently; each thread times its own call.
+        with ThreadPoolExecutor(max_workers=len(variants)) as ex:
+            futs = {k: ex.submit(_timed, fn, offsets, targets, weights, src, _BUFFERS[k], want_arrays) for k, fn in variants.items()}
+            runs = {k: f.result() for k, f in futs.items()}
+    else:
+        runs = {k: _timed(fn, offsets, targets, weights, src, _BUFFERS[k], want_arrays) for k, fn in variants.items()}
+    (dist_b, pred_b, stats_b), base_s = runs['baseline']
     base_heap = get_baseline_heap_stats()
     spec_ms = None
     spec_speedup = None
     spec_stats = None
     spec_parity_ok = None
     spec_heap = None
-    if _HAS_SPEC_CLEAN:
-        t_spec0 = time.perf_counter()
-        dist_spec, pred_spec, spec_stats = run_spec_clean(offsets, targets, weights, src)
-        t_spec1 = time.perf_counter()
-        spec_ms = (t_spec1 - t_spec0) * 1000.0
-        spec_speedup = (t1 - t0) / (t_spec1 - t_spec0) if (t_spec1 - t_spec0) > 0 else None
+    if 'spec' in runs:
+        (dist_spec, pred_spec, spec_stats), spec_s = runs['spec']
+        spec_ms = spec_s * 1000.0
+        spec_speedup = base_s / spec_s if spec_s > 0 else None
         spec_heap = get_spec_heap_stats()
         if verify_spec:
             # Parity: distances identical (allow tiny float epsilon)
-            mismatches = [i for i,(db,ds) in enumerate(zip(dist_b, dist_spec)) if abs(db-ds) > 1e-6 or (math.isinf(db) != math.isinf(ds))]
-            spec_parity_ok = (len(mismatches) == 0)
+            bad = _parity_check(dist_b, dist_spec, 1e-6)
+            spec_parity_ok = (bad == 0)
             if not spec_parity_ok:
-                print(f"[WARN] spec_clean parity mismatches n={n} count={len(mismatches)} sample={mismatches[:10]}")
+                # Rare path: recover mismatch indices only when reporting them
+                mismatches = np.flatnonzero(_mismatch_mask(dist_b, dist_spec, 1e-6))
+                print(f"[WARN] spec_clean parity mismatches n={n} count={bad} sample={mismatches[:10].tolist()}")
     return {
         'n': n,
         'density': density,
-        'm': offsets[-1],
-        'baseline_ms': (t1 - t0) * 1000.0,
+        'm': int(offsets[-1]),
+        'baseline_ms': base_s * 1000.0,
         'spec_ms': spec_ms,
         'spec_speedup': spec_speedup,
         'spec_parity_ok': spec_parity_ok,
@@ -85,13 +105,18 @@ def main():
     ap.add_argument('--seed', type=int, default=12345)
     ap.add_argument('--output', type=str, default='rust_variant_bench.json')
     ap.add_argument('--plot', type=str, default='rust_variant_bench.png')
+    ap.add_argument('--parallel-variants', action='store_true',
+                    help='Run baseline and spec_clean concurrently on the same graph (faster sweep; variants share memory bandwidth, so timings are noisier)')
+    ap.add_argument('--no-verify', action='store_true',
+                    help='Skip the baseline/spec_clean distance parity check (timing only; no dist/pred arrays returned)')
     args = ap.parse_args()
 
     sizes = [int(x) for x in args.sizes.split(',') if x.strip()]
 
     results = []
     for n in sizes:
-        r = run_trial(n, args.density, args.seed)
+        offsets, targets, weights = gen_cached(n, args.density, args.seed)
+        r = run_trial(n, args.density, offsets, targets, weights, verify_spec=not args.no_verify, parallel=args.parallel_variants)
         msg = f"n={n} base={r['baseline_ms']:.2f}ms"
         if r.get('baseline_heap') and r['baseline_heap'].get('max_size') is not None:
             msg += f" baseH={r['baseline_heap']['max_size']}"
@@ -178,11 +203,10 @@ def main():
         'fits': {
             'c1_m_plus_nlogn': c1,
             'c2_m_log23_n': c2,
-            'model_points': { 'overlay1_ms': list(map(float, overlay1)), 'overlay2_ms': list(map(float, overlay2)) }
+            'model_points': { 'overlay1_ms': overlay1, 'overlay2_ms': overlay2 }
         }
     }
-    with open(args.output, 'w') as f:
-        json.dump(output_payload, f, indent=2)
+    dump_json(args.output, output_payload)
     print(f"Saved JSON with fit constants to {args.output}")
 
 if __name__ == '__main__':
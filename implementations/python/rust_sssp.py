@@ -1,7 +1,21 @@
+"""ctypes bindings for the Rust SSSP core (libsssp_core).
+
+Each run_* takes a CSR graph (offsets, targets, weights) and a source and
+returns (dist, pred, stats), with dist/pred as float32/int32 NumPy arrays.
+
+For repeated runs, build the CSR once as C-contiguous ``np.uint32`` offsets
+and targets and ``np.float32`` weights: those are handed to Rust by pointer
+with no conversion, so one graph can be reused across variants and
+repetitions for free. Lists and other dtypes are converted on every call.
+Pass ``buffers=CsrBuffers()`` to also recycle the output arrays.
+"""
 import ctypes
+import mmap
 import os
+import threading
 import math
 from typing import Tuple, Dict, List
+import numpy as np
 
 # Locate shared library (assumes built in rust/sssp_core/target/release)
 LIB_PATH_CANDIDATES = [
@@ -13,7 +27,8 @@ LIB_PATH_CANDIDATES = [
 _lib = None
 for p in LIB_PATH_CANDIDATES:
     if os.path.exists(p):
-        _lib = ctypes.CDLL(p)
+        # RTLD_NOW binds every symbol up front; RTLD_LOCAL keeps them out of the global namespace
+        _lib = ctypes.CDLL(p, mode=getattr(os, 'RTLD_NOW', 0) | ctypes.RTLD_LOCAL)
         break
 if _lib is None:
     raise RuntimeError("Rust SSSP shared library not found. Build with `cargo build --release`.")
@@ -27,26 +42,52 @@ class SsspResultInfo(ctypes.Structure):
         ("error_code", ctypes.c_int32),
     ]
 
+# Pointer types resolved once; _run_fast hands every buffer over through these
+_P_U32 = ctypes.POINTER(ctypes.c_uint32)
+_P_F32 = ctypes.POINTER(ctypes.c_float)
+_P_I32 = ctypes.POINTER(ctypes.c_int32)
+
+_BASELINE_SIG = [ctypes.c_uint32, _P_U32, _P_U32, _P_F32, ctypes.c_uint32, _P_F32, _P_I32, ctypes.POINTER(SsspResultInfo)]
+
+# (mode, symbol, reported variant, argtypes) for the optional run entry points
+_OPTIONAL_SYMS = [
+    ('stoc', 'sssp_run_stoc', 'stoc', _BASELINE_SIG),
+    ('stoc_autotune', 'sssp_run_stoc_autotune', 'stoc_autotune', _BASELINE_SIG),
+    ('stoc_autotune_ex', 'sssp_run_stoc_autotune_ex', 'stoc_autotune', _BASELINE_SIG + [_P_F32, ctypes.c_uint32, ctypes.c_uint32]),
+    ('stoc_auto_adapt', 'sssp_run_stoc_auto_adapt', 'stoc_auto_adapt', _BASELINE_SIG),
+    ('spec_clean', 'sssp_run_spec_clean', 'spec_clean', _BASELINE_SIG),
+]
+
+# mode -> (bound FFI function, reported variant name), built in one probe pass
+# at import so _run does a single dict lookup; absent symbols get no entry.
 _lib.sssp_run_baseline.restype = ctypes.c_int32
-_lib.sssp_run_baseline.argtypes = [ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_uint32), ctypes.POINTER(ctypes.c_float), ctypes.c_uint32, ctypes.POINTER(ctypes.c_float), ctypes.POINTER(ctypes.c_int32), ctypes.POINTER(SsspResultInfo)]
-_HAS_STOC = hasattr(_lib, 'sssp_run_stoc')
-if _HAS_STOC:
-    _lib.sssp_run_stoc.restype = ctypes.c_int32
-    _lib.sssp_run_stoc.argtypes = _lib.sssp_run_baseline.argtypes
-_HAS_STOC_AUTOTUNE = hasattr(_lib, 'sssp_run_stoc_autotune')
-if _HAS_STOC_AUTOTUNE:
-    _lib.sssp_run_stoc_autotune = getattr(_lib, 'sssp_run_stoc_autotune')
-    _lib.sssp_run_stoc_autotune.restype = ctypes.c_int32
-    _lib.sssp_run_stoc_autotune.argtypes = _lib.sssp_run_baseline.argtypes
-_HAS_STOC_AUTO_ADAPT = hasattr(_lib, 'sssp_run_stoc_auto_adapt')
-if _HAS_STOC_AUTO_ADAPT:
-    _lib.sssp_run_stoc_auto_adapt.restype = ctypes.c_int32
-    _lib.sssp_run_stoc_auto_adapt.argtypes = _lib.sssp_run_baseline.argtypes
-_HAS_SPEC_CLEAN = hasattr(_lib, 'sssp_run_spec_clean')
-if _HAS_SPEC_CLEAN:
-    _lib.sssp_run_spec_clean.restype = ctypes.c_int32
-    _lib.sssp_run_spec_clean.argtypes = _lib.sssp_run_baseline.argtypes
+_lib.sssp_run_baseline.argtypes = _BASELINE_SIG
+_DISPATCH = {False: (_lib.sssp_run_baseline, 'baseline')}
+for _mode, _sym, _variant, _sig in _OPTIONAL_SYMS:
+    if hasattr(_lib, _sym):
+        _fn = getattr(_lib, _sym)
+        _fn.restype = ctypes.c_int32
+        _fn.argtypes = _sig
+        _DISPATCH[_mode] = (_fn, _variant)
+_HAS_STOC = 'stoc' in _DISPATCH
+_HAS_STOC_AUTOTUNE = 'stoc_autotune' in _DISPATCH
+_HAS_STOC_AUTOTUNE_EX = 'stoc_autotune_ex' in _DISPATCH
+_HAS_STOC_AUTO_ADAPT = 'stoc_auto_adapt' in _DISPATCH
+_HAS_SPEC_CLEAN = 'spec_clean' in _DISPATCH
+
+# Baseline with library-allocated outputs, released through sssp_free
+_HAS_BASELINE_ALLOC = hasattr(_lib, 'sssp_run_baseline_alloc') and hasattr(_lib, 'sssp_free')
+if _HAS_BASELINE_ALLOC:
+    _lib.sssp_run_baseline_alloc.restype = ctypes.c_int32
+    _lib.sssp_run_baseline_alloc.argtypes = _BASELINE_SIG[:5] + [ctypes.POINTER(_P_F32), ctypes.POINTER(_P_I32), ctypes.POINTER(SsspResultInfo)]
+    _lib.sssp_free.restype = None
+    _lib.sssp_free.argtypes = [_P_F32, _P_I32, ctypes.c_uint32]
+_HAS_BASELINE_BATCH = hasattr(_lib, 'sssp_run_baseline_batch')
+if _HAS_BASELINE_BATCH:
+    _lib.sssp_run_baseline_batch.restype = ctypes.c_int32
+    _lib.sssp_run_baseline_batch.argtypes = _BASELINE_SIG[:4] + [_P_U32, ctypes.c_uint32, _P_F32, _P_I32, ctypes.POINTER(SsspResultInfo)]
 _lib.sssp_version.restype = ctypes.c_uint32
+_VERSION = _lib.sssp_version()  # constant for the loaded library; reported in every stats dict
 
 # Optional bucket stats FFI
 class _BucketStats(ctypes.Structure):
@@ -59,6 +100,11 @@ if _HAS_BUCKET_STATS:
 def get_bucket_stats():
     if not _HAS_BUCKET_STATS:
         return None
+    bs=_BucketStats(); _lib.sssp_get_bucket_stats(ctypes.byref(bs))
+    return {'buckets_visited': bs.buckets_visited, 'light_pass_repeats': bs.light_pass_repeats,
+            'max_bucket_index': bs.max_bucket_index, 'restarts': bs.restarts,
+            'delta': _lib.sssp_get_last_delta(), 'heavy_ratio': bs.heavy_ratio_x1000 / 1000.0}
+
 class _BaselineHeapStats(ctypes.Structure):
     _fields_=[('pushes',ctypes.c_uint64),('pops',ctypes.c_uint64),('max_size',ctypes.c_uint64)]
 _HAS_BASE_HEAP = hasattr(_lib,'sssp_get_baseline_heap_stats')
@@ -84,8 +130,36 @@ def get_spec_heap_stats():
     hs=_SpecHeapStats(); _lib.sssp_get_spec_heap_stats(ctypes.byref(hs))
     return {'pushes': hs.pushes, 'pops': hs.pops, 'max_size': hs.max_size}
 
-def run_baseline(offsets, targets, weights, source: int):
-    return _run(offsets, targets, weights, source, False)
+# Which run_* entry points the loaded library actually backs; the wrappers
+# themselves always exist and raise RuntimeError when their symbol is missing.
+_HAS_VARIANT = {
+    'run_baseline': True,
+    'run_stoc': _HAS_STOC,
+    'run_stoc_autotune': _HAS_STOC_AUTOTUNE,
+    'run_stoc_autotune_ex': _HAS_STOC_AUTOTUNE_EX,  # run_stoc_autotune with autotune_set/autotune_limit
+    'run_stoc_auto_adapt': _HAS_STOC_AUTO_ADAPT,
+    'run_spec_clean': _HAS_SPEC_CLEAN,
+    'run_baseline_alloc': _HAS_BASELINE_ALLOC,
+    'run_baseline_batch': _HAS_BASELINE_BATCH,
+}
+
+def has_variant(name: str) -> bool:
+    return _HAS_VARIANT.get(name, False)
+
+def _make_runner(mode, available, missing_msg):
+    # Bind each fixed-signature run_* at import: either a direct call into
+    # _run_fast with the FFI function pre-resolved, or a stub that raises.
+    if not available:
+        def runner(offsets, targets, weights, source: int, *, buffers=None, return_arrays=True):
+            raise RuntimeError(missing_msg)
+    else:
+        fn, variant = _DISPATCH[mode]
+        def runner(offsets, targets, weights, source: int, *, buffers=None, return_arrays=True):
+            return _run_fast(fn, variant, offsets, targets, weights, source, buffers=buffers, return_arrays=return_arrays)
+    runner.__name__ = runner.__qualname__ = 'run_' + (mode or 'baseline')
+    return runner
+
+run_baseline = _make_runner(False, True, '')
 
 def run_optimized(*_args, **_kwargs):
     raise RuntimeError("Optimized variant removed; only baseline and stoc available")
@@ -93,58 +167,224 @@ def run_optimized(*_args, **_kwargs):
 def run_hybrid(*_args, **_kwargs):
     raise RuntimeError("Hybrid variant removed; only baseline and stoc available")
 
-def run_stoc(offsets, targets, weights, source: int):
-    if not _HAS_STOC:
-        raise RuntimeError("STOC (delta-stepping) function not available in loaded library")
-    return _run(offsets, targets, weights, source, 'stoc')
-
-def run_stoc_autotune(offsets, targets, weights, source: int):
-    if not _HAS_STOC_AUTOTUNE:
-        raise RuntimeError("STOC autotune function not available in loaded library")
-    return _run(offsets, targets, weights, source, 'stoc_autotune')
-
-def run_stoc_auto_adapt(offsets, targets, weights, source: int):
-    if not _HAS_STOC_AUTO_ADAPT:
-        raise RuntimeError("Unified autotune+adaptive function not available")
-    return _run(offsets, targets, weights, source, 'stoc_auto_adapt')
-
-def run_spec_clean(offsets, targets, weights, source: int):
-    if not _HAS_SPEC_CLEAN:
-        raise RuntimeError('spec_clean function not available in loaded library')
-    return _run(offsets, targets, weights, source, 'spec_clean')
-
-def _run(offsets, targets, weights, source: int, mode):
-    n = len(offsets) - 1
-    m = len(targets)
-    assert len(weights) == m
-    OffArr = (ctypes.c_uint32 * (n + 1))(*offsets)
-    TgtArr = (ctypes.c_uint32 * m)(*targets)
-    WArr = (ctypes.c_float * m)(*weights)
-    DistArr = (ctypes.c_float * n)()
-    PredArr = (ctypes.c_int32 * n)()
-    info = SsspResultInfo()
-    if mode == 'stoc':
-        fn = _lib.sssp_run_stoc; variant = 'stoc'
-    elif mode == 'stoc_autotune':
-        fn = _lib.sssp_run_stoc_autotune; variant = 'stoc_autotune'
-    elif mode == 'stoc_auto_adapt':
-        fn = _lib.sssp_run_stoc_auto_adapt; variant = 'stoc_auto_adapt'
-    elif mode == 'spec_clean':
-        fn = _lib.sssp_run_spec_clean; variant = 'spec_clean'
+run_stoc = _make_runner('stoc', _HAS_STOC, "STOC (delta-stepping) function not available in loaded library")
+
+def run_stoc_autotune(offsets, targets, weights, source: int, *, autotune_set=None, autotune_limit=None, buffers=None, return_arrays=True):
+    """Autotuned STOC. `autotune_set` (delta multipliers) and `autotune_limit`
+    (trial settle cap) override SSSP_STOC_AUTOTUNE_SET / SSSP_STOC_AUTOTUNE_LIMIT
+    for this call only; None keeps the env/default value."""
+    if autotune_set is None and autotune_limit is None:
+        if not _HAS_STOC_AUTOTUNE:
+            raise RuntimeError("STOC autotune function not available in loaded library")
+        return _run(offsets, targets, weights, source, 'stoc_autotune', buffers=buffers, return_arrays=return_arrays)
+    if not _HAS_STOC_AUTOTUNE_EX:
+        raise RuntimeError("STOC autotune with explicit parameters not available in loaded library")
+    cands = np.ascontiguousarray(autotune_set if autotune_set is not None else [], dtype=np.float32)
+    extra = (cands.ctypes.data_as(_P_F32), cands.size, autotune_limit or 0)
+    return _run(offsets, targets, weights, source, 'stoc_autotune_ex', extra, buffers, return_arrays)
+
+run_stoc_auto_adapt = _make_runner('stoc_auto_adapt', _HAS_STOC_AUTO_ADAPT, "Unified autotune+adaptive function not available")
+run_spec_clean = _make_runner('spec_clean', _HAS_SPEC_CLEAN, 'spec_clean function not available in loaded library')
+
+# alloc_large arrays at least this large are mmap'd and advised onto transparent
+# huge pages (Linux); elsewhere, or below the threshold, plain np.empty is used.
+_HUGEPAGE_BYTES = 2 << 20
+_MADV_HUGEPAGE = getattr(mmap, 'MADV_HUGEPAGE', None)
+
+def alloc_large(size, dtype):
+    """Empty 1-D array for CSR inputs/outputs handed to the Rust core.
+
+    Arrays of 2 MiB or more are carved from a 2 MiB-aligned anonymous mapping
+    advised with MADV_HUGEPAGE, so the streamed CSR arrays can sit on huge
+    pages (fewer TLB misses); smaller ones, or platforms without the advice,
+    get a plain np.empty.
+    """
+    dtype = np.dtype(dtype)
+    nbytes = size * dtype.itemsize
+    if _MADV_HUGEPAGE is None or nbytes < _HUGEPAGE_BYTES:
+        return np.empty(max(size, 1), dtype=dtype)[:size]
+    span = -(-nbytes // _HUGEPAGE_BYTES) * _HUGEPAGE_BYTES
+    # mmap only guarantees page alignment: over-map by one huge page and
+    # start the array at the first 2 MiB boundary
+    buf = mmap.mmap(-1, span + _HUGEPAGE_BYTES)
+    raw = np.frombuffer(buf, dtype=np.uint8)
+    start = -raw.ctypes.data % _HUGEPAGE_BYTES
+    try:
+        buf.madvise(_MADV_HUGEPAGE, start, span)
+    except OSError:  # THP disabled in this kernel; the mapping is still usable
+        pass
+    return raw[start:start + nbytes].view(dtype)
+
+class CsrBuffers:
+    """Grow-only scratch arrays reused across run_* calls (``buffers=``).
+
+    Holds the dist/pred outputs and staging copies for inputs that are not
+    already in the ABI dtype. Arrays returned by a run that used the pool are
+    views into it and are overwritten by the next run with the same pool.
+    """
+    def __init__(self):
+        self._arrays = {}
+
+    def take(self, name, size, dtype):
+        arr = self._arrays.get(name)
+        if arr is None or arr.size < size or arr.dtype != dtype:
+            arr = alloc_large(size, dtype)
+            self._arrays[name] = arr
+        return arr[:size]
+
+    def get(self, n):
+        return self.take('dist', n, np.float32), self.take('pred', n, np.int32)
+
+def _abi_array(a, dtype, name, buffers):
+    # Fast path: already an ABI-typed contiguous ndarray, used as-is
+    if type(a) is np.ndarray and a.dtype == dtype and a.flags.c_contiguous:
+        return a
+    arr = np.asarray(a)
+    if buffers is None:
+        return np.ascontiguousarray(arr, dtype=dtype)
+    out = buffers.take(name, arr.size, dtype)
+    np.copyto(out, arr.reshape(-1), casting='unsafe')
+    return out
+
+# Per-thread reusable state: the SsspResultInfo handed to every call, and the
+# pool that receives dist/pred when the caller asked for stats only
+_tls = threading.local()
+
+def _discard_buffers():
+    pool = getattr(_tls, 'pool', None)
+    if pool is None:
+        pool = _tls.pool = CsrBuffers()
+    return pool
+
+_INFO_SIZE = ctypes.sizeof(SsspResultInfo)
+
+def _result_info():
+    # Returns the zeroed per-thread struct plus a byref() to it created once,
+    # so calls don't allocate a fresh CArgObject each time
+    slot = getattr(_tls, 'info', None)
+    if slot is None:
+        info = SsspResultInfo()
+        slot = _tls.info = (info, ctypes.byref(info))
     else:
-        fn = _lib.sssp_run_baseline; variant = 'baseline'
-    rc = fn(n, OffArr, TgtArr, WArr, source, DistArr, PredArr, ctypes.byref(info))
+        ctypes.memset(slot[1], 0, _INFO_SIZE)
+    return slot
+
+def _run(offsets, targets, weights, source: int, mode, extra_args=(), buffers=None, return_arrays=True):
+    fn, variant = _DISPATCH[mode]
+    return _run_fast(fn, variant, offsets, targets, weights, source, extra_args, buffers, return_arrays)
+
+def _run_fast(fn, variant, offsets, targets, weights, source: int, extra_args=(), buffers=None, return_arrays=True):
+    # return_arrays=False: dist/pred land in a reused per-thread pool and
+    # (None, None, stats) is returned, so timing-only calls allocate nothing O(n)
+    if not return_arrays and buffers is None:
+        buffers = _discard_buffers()
+    # CSR inputs are handed to Rust as raw pointers; arrays already in the
+    # ABI dtype (uint32 / float32, C-contiguous) are passed without a copy,
+    # others are converted (into the pool's staging arrays when given one).
+    off_np = _abi_array(offsets, np.uint32, 'offsets', buffers)
+    tgt_np = _abi_array(targets, np.uint32, 'targets', buffers)
+    w_np = _abi_array(weights, np.float32, 'weights', buffers)
+    n = off_np.size - 1
+    m = tgt_np.size
+    assert w_np.size == m
+    OffArr = off_np.ctypes.data_as(_P_U32)
+    TgtArr = tgt_np.ctypes.data_as(_P_U32)
+    WArr = w_np.ctypes.data_as(_P_F32)
+    # Outputs are NumPy arrays Rust writes into directly and are returned as-is
+    if buffers is not None:
+        dist, pred = buffers.get(n)
+    else:
+        dist = np.empty(n, dtype=np.float32)
+        pred = np.empty(n, dtype=np.int32)
+    DistArr = dist.ctypes.data_as(_P_F32)
+    PredArr = pred.ctypes.data_as(_P_I32)
+    info, info_ref = _result_info()
+    rc = fn(n, OffArr, TgtArr, WArr, source, DistArr, PredArr, info_ref, *extra_args)
+    if rc != 0:
+        raise RuntimeError(f"Rust core returned error {rc}")
+    if not return_arrays:
+        dist = pred = None
+    return dist, pred, _info_dict(info, variant)
+
+def _info_dict(info, variant):
+    return {
+        'relaxations': info.relaxations,
+        'light_relaxations': info.light_relaxations,
+        'heavy_relaxations': info.heavy_relaxations,
+        'settled': info.settled,
+        'version': _VERSION,
+        'variant': variant
+    }
+
+class _RustOwned:
+    """Owns one sssp_run_baseline_alloc result; sssp_free runs once neither array references it."""
+    __slots__ = ('dist', 'pred', 'n')
+    # Bound on the class so __del__ still works at interpreter shutdown, when
+    # module globals such as _lib may already have been cleared
+    _free = _lib.sssp_free if _HAS_BASELINE_ALLOC else None
+
+    def __init__(self, dist, pred, n):
+        self.dist, self.pred, self.n = dist, pred, n
+
+    def __del__(self):
+        free = self._free
+        if free is not None:
+            free(self.dist, self.pred, self.n)
+
+class _RustView:
+    # Exposes a Rust-owned buffer to NumPy; the resulting array's .base keeps the owner alive
+    __slots__ = ('__array_interface__', '_owner')
+
+    def __init__(self, owner, ptr, typestr, n):
+        self._owner = owner
+        self.__array_interface__ = {'shape': (n,), 'typestr': typestr, 'version': 3,
+                                    'data': (ctypes.cast(ptr, ctypes.c_void_p).value, False)}
+
+def run_baseline_alloc(offsets, targets, weights, source: int):
+    """Baseline Dijkstra with dist/pred allocated by the Rust side.
+
+    Returns the same (dist, pred, stats) as run_baseline, but the arrays are
+    zero-copy views of Rust-owned memory, freed when both are garbage collected.
+    """
+    if not _HAS_BASELINE_ALLOC:
+        raise RuntimeError('sssp_run_baseline_alloc not available in loaded library')
+    off_np = _abi_array(offsets, np.uint32, 'offsets', None)
+    tgt_np = _abi_array(targets, np.uint32, 'targets', None)
+    w_np = _abi_array(weights, np.float32, 'weights', None)
+    n = off_np.size - 1
+    assert w_np.size == tgt_np.size
+    dist_p = _P_F32(); pred_p = _P_I32()
+    info, info_ref = _result_info()
+    rc = _lib.sssp_run_baseline_alloc(n, off_np.ctypes.data_as(_P_U32), tgt_np.ctypes.data_as(_P_U32), w_np.ctypes.data_as(_P_F32),
+                                      source, ctypes.byref(dist_p), ctypes.byref(pred_p), info_ref)
+    if rc != 0:
+        raise RuntimeError(f"Rust core returned error {rc}")
+    owner = _RustOwned(dist_p, pred_p, n)
+    dist = np.asarray(_RustView(owner, dist_p, '<f4', n))
+    pred = np.asarray(_RustView(owner, pred_p, '<i4', n))
+    return dist, pred, _info_dict(info, 'baseline')
+
+def run_baseline_batch(offsets, targets, weights, sources):
+    """Baseline Dijkstra from every source in `sources` over one graph.
+
+    The CSR arrays are marshalled once and all sources run in a single FFI
+    call. Returns (dist, pred, stats): dist/pred have shape (len(sources), n)
+    with row k answering sources[k], and stats is a list of per-source dicts.
+    """
+    if not _HAS_BASELINE_BATCH:
+        raise RuntimeError('sssp_run_baseline_batch not available in loaded library')
+    off_np = _abi_array(offsets, np.uint32, 'offsets', None)
+    tgt_np = _abi_array(targets, np.uint32, 'targets', None)
+    w_np = _abi_array(weights, np.float32, 'weights', None)
+    src_np = _abi_array(sources, np.uint32, 'sources', None)
+    n = off_np.size - 1
+    k = src_np.size
+    assert w_np.size == tgt_np.size
+    dist = np.empty((k, n), dtype=np.float32)
+    pred = np.empty((k, n), dtype=np.int32)
+    infos = (SsspResultInfo * k)()
+    rc = _lib.sssp_run_baseline_batch(n, off_np.ctypes.data_as(_P_U32), tgt_np.ctypes.data_as(_P_U32), w_np.ctypes.data_as(_P_F32),
+                                      src_np.ctypes.data_as(_P_U32), k, dist.ctypes.data_as(_P_F32), pred.ctypes.data_as(_P_I32), infos)
     if rc != 0:
         raise RuntimeError(f"Rust core returned error {rc}")
-    return (
-        [DistArr[i] for i in range(n)],
-        [PredArr[i] for i in range(n)],
-        {
-            'relaxations': info.relaxations,
-            'light_relaxations': info.light_relaxations,
-            'heavy_relaxations': info.heavy_relaxations,
-            'settled': info.settled,
-            'version': _lib.sssp_version(),
-            'variant': variant
-        }
-    )
+    return dist, pred, [_info_dict(info, 'baseline') for info in infos]
@@ -0,0 +1,99 @@
+import sys, gc
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent))
+import numpy as np
+import rust_sssp
+from _bench_common import generate_graph_csr
+
+def test_baseline_alloc_matches_baseline():
+    if not rust_sssp.has_variant('run_baseline_alloc'):
+        print('skip: run_baseline_alloc not available')
+        return
+    offs,tg,wt=generate_graph_csr(5000,3.0,seed=7)
+    bd,bp,binfo=rust_sssp.run_baseline(offs,tg,wt,0)
+    dist,pred,info=rust_sssp.run_baseline_alloc(offs,tg,wt,0)
+    assert dist.dtype==np.float32 and pred.dtype==np.int32
+    np.testing.assert_array_equal(bd,dist)
+    np.testing.assert_array_equal(bp,pred)
+    assert info['relaxations']==binfo['relaxations']
+
+def test_baseline_alloc_view_outlives_arrays():
+    if not rust_sssp.has_variant('run_baseline_alloc'):
+        print('skip: run_baseline_alloc not available')
+        return
+    offs,tg,wt=generate_graph_csr(5000,3.0,seed=7)
+    bd,_,_=rust_sssp.run_baseline(offs,tg,wt,0)
+    dist,pred,_=rust_sssp.run_baseline_alloc(offs,tg,wt,0)
+    tail=dist[100:]
+    del dist, pred
+    gc.collect()
+    # churn the allocator so a freed buffer would likely be reused
+    junk=[rust_sssp.run_baseline_alloc(offs,tg,wt,1) for _ in range(4)]
+    np.testing.assert_array_equal(tail,bd[100:])
+    del junk
+
+def test_baseline_alloc_bad_source():
+    if not rust_sssp.has_variant('run_baseline_alloc'):
+        print('skip: run_baseline_alloc not available')
+        return
+    offs,tg,wt=generate_graph_csr(100,2.0)
+    try:
+        rust_sssp.run_baseline_alloc(offs,tg,wt,100)
+    except RuntimeError:
+        return
+    assert False, 'out-of-range source did not raise'
+
+def test_baseline_batch_rows_match_baseline():
+    if not rust_sssp.has_variant('run_baseline_batch'):
+        print('skip: run_baseline_batch not available')
+        return
+    offs,tg,wt=generate_graph_csr(5000,3.0,seed=7)
+    sources=[0,17,4999]
+    dist,pred,infos=rust_sssp.run_baseline_batch(offs,tg,wt,sources)
+    assert dist.shape==pred.shape==(len(sources),5000) and len(infos)==len(sources)
+    for k,src in enumerate(sources):
+        bd,bp,binfo=rust_sssp.run_baseline(offs,tg,wt,src)
+        np.testing.assert_array_equal(dist[k],bd)
+        np.testing.assert_array_equal(pred[k],bp)
+        assert infos[k]==binfo
+
+def test_baseline_batch_bad_source():
+    if not rust_sssp.has_variant('run_baseline_batch'):
+        print('skip: run_baseline_batch not available')
+        return
+    offs,tg,wt=generate_graph_csr(100,2.0)
+    try:
+        rust_sssp.run_baseline_batch(offs,tg,wt,[0,100])
+    except RuntimeError:
+        return
+    assert False, 'out-of-range source did not raise'
+
+def test_alloc_large_hugepage_arrays():
+    big=rust_sssp.alloc_large(3<<20,np.float32)  # 12 MiB: mapped path
+    assert big.dtype==np.float32 and big.size==3<<20 and big.flags.c_contiguous and big.flags.writeable
+    if rust_sssp._MADV_HUGEPAGE is not None:
+        assert big.ctypes.data % rust_sssp._HUGEPAGE_BYTES == 0
+    big[:]=2.0
+    assert float(big[-1])==2.0
+    small=rust_sssp.alloc_large(0,np.uint32)
+    assert small.size==0 and small.dtype==np.uint32
+
+def test_generated_csr_uses_large_buffers():
+    # m = 600k edges: targets/weights are over 2 MiB and come from alloc_large
+    offs,tg,wt=generate_graph_csr(600000,1.0,seed=3)
+    if rust_sssp._MADV_HUGEPAGE is not None:
+        assert tg.ctypes.data % rust_sssp._HUGEPAGE_BYTES == 0
+        assert wt.ctypes.data % rust_sssp._HUGEPAGE_BYTES == 0
+    d1,p1,_=rust_sssp.run_baseline(offs,tg,wt,0)
+    d2,p2,_=rust_sssp.run_baseline(np.array(offs),np.array(tg),np.array(wt),0)
+    np.testing.assert_array_equal(d1,d2)
+    np.testing.assert_array_equal(p1,p2)
+
+if __name__=='__main__':
+    test_baseline_alloc_matches_baseline()
+    test_baseline_alloc_view_outlives_arrays()
+    test_baseline_alloc_bad_source()
+    test_baseline_batch_rows_match_baseline()
+    test_baseline_batch_bad_source()
+    test_alloc_large_hugepage_arrays()
+    test_generated_csr_uses_large_buffers()
@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent))
+import numpy as np
+import _bench_common
+
+def test_generator_paths_agree():
+    if _bench_common.numba is None:
+        print('skip: numba not available')
+        return
+    n,density,seed=20000,3.0,12345
+    m=int(density*n)
+    fast=_bench_common._gen_graph_numba(n,m,1.0,10.0,seed,4,np.empty(m,np.uint32),np.empty(m,np.float32))
+    offs,tg,wt=_bench_common.generate_graph_csr(n,density,seed)  # NumPy path below NUMBA_EDGE_THRESHOLD
+    np.testing.assert_array_equal(fast[0],offs)
+    np.testing.assert_array_equal(fast[1],tg)
+    np.testing.assert_array_equal(fast[2],wt)
+
+if __name__=='__main__':
+    test_generator_paths_agree()
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).resolve().parent))
+import numpy as np
+import rust_sssp
+from _bench_common import generate_graph_csr
+
+def test_pooled_matches_unpooled():
+    offs,tg,wt=generate_graph_csr(5000,3.0,seed=11)
+    bd,bp,binfo=rust_sssp.run_baseline(offs,tg,wt,0)
+    pd,pp,pinfo=rust_sssp.run_baseline(offs,tg,wt,0,buffers=rust_sssp.CsrBuffers())
+    np.testing.assert_array_equal(bd,pd)
+    np.testing.assert_array_equal(bp,pp)
+    assert binfo==pinfo
+
+def test_pool_reuses_storage():
+    offs,tg,wt=generate_graph_csr(5000,3.0,seed=11)
+    buf=rust_sssp.CsrBuffers()
+    d1,p1,_=rust_sssp.run_baseline(offs,tg,wt,0,buffers=buf)
+    first=d1.copy()
+    d2,p2,_=rust_sssp.run_baseline(offs,tg,wt,1,buffers=buf)
+    # same memory: the first result is overwritten by the second call
+    assert d1.ctypes.data==d2.ctypes.data and p1.ctypes.data==p2.ctypes.data
+    np.testing.assert_array_equal(d1,d2)
+    assert not np.array_equal(first,d2)
+
+def test_pool_stages_non_abi_inputs():
+    offs,tg,wt=generate_graph_csr(2000,3.0,seed=5)
+    bd,bp,_=rust_sssp.run_baseline(offs,tg,wt,0)
+    buf=rust_sssp.CsrBuffers()
+    # Python lists and int64/float64 arrays are converted into the pool's staging arrays
+    ld,lp,_=rust_sssp.run_baseline(offs.tolist(),tg.tolist(),wt.tolist(),0,buffers=buf)
+    np.testing.assert_array_equal(bd,ld); np.testing.assert_array_equal(bp,lp)
+    staged=buf.take('targets',tg.size,np.uint32)
+    np.testing.assert_array_equal(staged,tg)
+    id_,ip,_=rust_sssp.run_baseline(offs.astype(np.int64),tg.astype(np.int64),wt.astype(np.float64),0,buffers=buf)
+    np.testing.assert_array_equal(bd,id_); np.testing.assert_array_equal(bp,ip)
+    assert buf.take('targets',tg.size,np.uint32).ctypes.data==staged.ctypes.data
+
+def test_return_arrays_false():
+    offs,tg,wt=generate_graph_csr(2000,3.0,seed=5)
+    _,_,binfo=rust_sssp.run_baseline(offs,tg,wt,0)
+    dist,pred,info=rust_sssp.run_baseline(offs,tg,wt,0,return_arrays=False)
+    assert dist is None and pred is None
+    assert info==binfo
+    # also with an explicit pool, and on the keyword-heavy autotune wrapper
+    dist,pred,_=rust_sssp.run_baseline(offs,tg,wt,0,buffers=rust_sssp.CsrBuffers(),return_arrays=False)
+    assert dist is None and pred is None
+    if rust_sssp.has_variant('run_stoc_autotune'):
+        dist,pred,info=rust_sssp.run_stoc_autotune(offs,tg,wt,0,return_arrays=False)
+        assert dist is None and pred is None and info['settled']>0
+
+if __name__=='__main__':
+    test_pooled_matches_unpooled()
+    test_pool_reuses_storage()
+    test_pool_stages_non_abi_inputs()
+    test_return_arrays_false()
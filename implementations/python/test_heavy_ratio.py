@@ -1,30 +1,29 @@
-import os, random, sys, ctypes
+import os, sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent))
 import rust_sssp
-from ctypes import Structure, c_uint32, byref
+from ctypes import byref
+import numpy as np
 
-class BucketStats(Structure):
-    _fields_=[('buckets_visited',c_uint32),('light_pass_repeats',c_uint32),('max_bucket_index',c_uint32),('restarts',c_uint32),('delta_x1000',c_uint32),('heavy_ratio_x1000',c_uint32)]
+# Shared FFI binding; its argtypes are set by rust_sssp and must not be rebound here
+BucketStats = rust_sssp._BucketStats
+# all fields are uint32, so the struct reads as one array; index by field position
+_BS = {name: i for i, (name, _) in enumerate(BucketStats._fields_)}
 
-HAS_STATS = hasattr(rust_sssp._lib,'sssp_get_bucket_stats')
-if HAS_STATS:
-    rust_sssp._lib.sssp_get_bucket_stats.argtypes=[ctypes.POINTER(BucketStats)]  # type: ignore
+HAS_STATS = rust_sssp._HAS_BUCKET_STATS
 
 def gen_graph(n,density,seed=1234):
-    rnd=random.Random(seed)
+    rng=np.random.default_rng(seed)
     m=int(density*n)
-    adj=[[] for _ in range(n)]
-    for _ in range(m):
-        u=rnd.randrange(n); v=rnd.randrange(n)
-        if u==v: continue
-        w=rnd.random()*9+1
-        adj[u].append((v,w))
-    offs=[0]; tg=[]; wt=[]
-    for u in range(n):
-        for v,w in adj[u]:
-            tg.append(v); wt.append(w)
-        offs.append(len(tg))
+    u=rng.integers(0,n,size=m,dtype=np.uint32); v=rng.integers(0,n,size=m,dtype=np.uint32)
+    w=rng.random(m,dtype=np.float32)*9+1
+    mask=u!=v
+    u,v,w=u[mask],v[mask],w[mask]
+    # stable sort by source keeps each adjacency in draw order
+    order=np.argsort(u,kind='stable')
+    tg=v[order]; wt=w[order]
+    offs=np.empty(n+1,dtype=np.uint32); offs[0]=0
+    np.cumsum(np.bincount(u,minlength=n),out=offs[1:],dtype=np.uint32)
     return offs,tg,wt
 
 def test_heavy_ratio_band():
@@ -36,10 +35,11 @@ def test_heavy_ratio_band():
     offs,tg,wt=gen_graph(n,density)
     rust_sssp.run_stoc(offs,tg,wt,0)
     bs=BucketStats(); rust_sssp._lib.sssp_get_bucket_stats(byref(bs))
-    heavy = bs.heavy_ratio_x1000 / 1000.0
+    f=np.frombuffer(memoryview(bs).cast('B'),dtype=np.uint32)
+    heavy = f[_BS['heavy_ratio_x1000']] / 1000.0
     assert heavy > 0.0, f"heavy ratio zero (delta likely too large): {heavy}" 
     assert 0.0 < heavy <= 0.95, f"heavy ratio out of plausible bounds: {heavy}" 
-    print(f"Heavy ratio OK: {heavy:.3f} restarts={bs.restarts} delta={(bs.delta_x1000/1000.0):.4f}")
+    print(f"Heavy ratio OK: {heavy:.3f} restarts={f[_BS['restarts']]} delta={(f[_BS['delta_x1000']]/1000.0):.4f}")
 
 if __name__=='__main__':
     test_heavy_ratio_band()
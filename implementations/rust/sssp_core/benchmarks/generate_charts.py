@@ -24,14 +24,38 @@ Flags:
 import argparse, json, math, os
 from typing import List, Dict, Any
 import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # file output only; no GUI backend startup
 import matplotlib.pyplot as plt
-import seaborn as sns
 
 PHASE_FIELDS = {
     'phase3': ('phase3_ms','phase3_speedup'),
     'boundary_chain': ('boundary_chain_ms','boundary_chain_speedup')
 }
 
+_FIG = None
+
+def _fresh_axes(figsize):
+    # One Figure is reused for every chart: cleared and resized instead of
+    # building and tearing down a new one per output file.
+    global _FIG
+    if _FIG is None:
+        _FIG = plt.figure(figsize=figsize)
+    else:
+        _FIG.clear(); _FIG.set_size_inches(*figsize)
+    return _FIG, _FIG.add_subplot(111)
+
+
+def _heatmap(ax, mat, cmap, xticklabels, yticklabels):
+    # Rasterized mesh (NaN cells masked) instead of per-cell seaborn patches; row 0 at the top.
+    mesh = ax.pcolormesh(np.ma.masked_invalid(mat), cmap=cmap, rasterized=True)
+    ax.figure.colorbar(mesh, ax=ax)
+    ax.set_xticks(np.arange(len(xticklabels)) + 0.5); ax.set_xticklabels(xticklabels)
+    ax.set_yticks(np.arange(len(yticklabels)) + 0.5); ax.set_yticklabels(yticklabels)
+    ax.invert_yaxis()
+
+
 def load_runs(path: str) -> List[Dict[str,Any]]:
     with open(path,'r') as f: data = json.load(f)
     if isinstance(data, dict) and 'runs' in data: return data['runs']
@@ -61,7 +85,7 @@ def plot_line_charts(by_deg, phase_key, out_prefix, include_bc):
         base = [r['baseline_ms'] for r in runs]
         spec = [r[primary_ms_field] for r in runs]
         speed = [r[speedup_field] for r in runs]
-        fig, ax1 = plt.subplots(figsize=(7,4))
+        fig, ax1 = _fresh_axes((7,4))
         ax1.plot(sizes, base, label='Baseline ms', marker='o')
         ax1.plot(sizes, spec, label=f'{phase_key} ms', marker='o')
         ax1.set_xlabel('n')
@@ -75,55 +99,52 @@ def plot_line_charts(by_deg, phase_key, out_prefix, include_bc):
         ax2.legend(loc='lower right')
         fig.tight_layout()
         fig.savefig(f'{out_prefix}_benchmark.png', dpi=130)
-        plt.close(fig)
     else:
         # multi-degree line chart for speedup
-        fig, ax = plt.subplots(figsize=(7,4))
+        fig, ax = _fresh_axes((7,4))
         for deg in degrees:
             runs = by_deg[deg]
             sizes = [r['n'] for r in runs]
             speed = [r[speedup_field] for r in runs]
             ax.plot(sizes, speed, marker='o', label=f'deg={deg:g}')
         ax.set_xscale('log'); ax.set_xlabel('n'); ax.set_ylabel('Speedup'); ax.set_title(f'{phase_key} speedup vs baseline'); ax.legend(fontsize='small')
-        fig.tight_layout(); fig.savefig(f'{out_prefix}_speedup_multi_degree.png', dpi=130); plt.close(fig)
+        fig.tight_layout(); fig.savefig(f'{out_prefix}_speedup_multi_degree.png', dpi=130)
     # Optional boundary chain comparative chart if multiple degrees and included
     if include_bc:
         bc_field = 'boundary_chain_ms'
-        fig, ax = plt.subplots(figsize=(7,4))
+        fig, ax = _fresh_axes((7,4))
         for deg in degrees:
             runs = by_deg[deg]
             sizes = [r['n'] for r in runs]
             vals = [r[bc_field] for r in runs]
             ax.plot(sizes, vals, marker='o', label=f'deg={deg:g}')
         ax.set_xscale('log'); ax.set_yscale('log'); ax.set_xlabel('n'); ax.set_ylabel('Boundary chain ms'); ax.set_title('Boundary chain times'); ax.legend(fontsize='small')
-        fig.tight_layout(); fig.savefig(f'{out_prefix}_boundary_chain_times.png', dpi=130); plt.close(fig)
+        fig.tight_layout(); fig.savefig(f'{out_prefix}_boundary_chain_times.png', dpi=130)
 
 
 def plot_heatmaps(by_deg, phase_key, out_prefix):
     primary_ms_field, speedup_field = PHASE_FIELDS[phase_key]
-    degrees = sorted(by_deg.keys())
-    sizes = sorted({r['n'] for lst in by_deg.values() for r in lst})
-    # Build matrices
-    speed_mat = np.full((len(degrees), len(sizes)), np.nan)
-    base_mat = np.full((len(degrees), len(sizes)), np.nan)
-    for di, deg in enumerate(degrees):
-        rmap = {r['n']: r for r in by_deg[deg]}
-        for si, n in enumerate(sizes):
-            if n in rmap:
-                speed_mat[di, si] = rmap[n][speedup_field]
-                base_mat[di, si] = rmap[n]['baseline_ms']
+    # Build (degree x n) matrices with one pivot; missing cells stay NaN and the
+    # last run wins for duplicate (degree, n) pairs
+    df = pd.DataFrame([{'avg_degree': deg, 'n': r['n'], 'speedup': r[speedup_field], 'baseline_ms': r['baseline_ms']}
+                       for deg, lst in by_deg.items() for r in lst])
+    grid = df.drop_duplicates(['avg_degree', 'n'], keep='last').pivot(index='avg_degree', columns='n').sort_index()
+    degrees = list(grid.index)
+    sizes = sorted(grid.columns.get_level_values('n').unique())
+    speed_mat = grid['speedup'].reindex(columns=sizes).to_numpy(dtype=float)
+    base_mat = grid['baseline_ms'].reindex(columns=sizes).to_numpy(dtype=float)
     # Speedup heatmap
-    fig, ax = plt.subplots(figsize=(8,4))
-    sns.heatmap(speed_mat, annot=False, cmap='viridis', xticklabels=sizes, yticklabels=[f'deg={d:g}' for d in degrees], ax=ax)
+    fig, ax = _fresh_axes((8,4))
+    _heatmap(ax, speed_mat, 'viridis', sizes, [f'deg={d:g}' for d in degrees])
     ax.set_xlabel('n'); ax.set_ylabel('avg_degree'); ax.set_title(f'{phase_key} speedup')
-    fig.tight_layout(); fig.savefig(f'{out_prefix}_heatmap_speedup.png', dpi=130); plt.close(fig)
+    fig.tight_layout(); fig.savefig(f'{out_prefix}_heatmap_speedup.png', dpi=130)
     # Baseline heatmap (log color)
-    fig, ax = plt.subplots(figsize=(8,4))
+    fig, ax = _fresh_axes((8,4))
     # Avoid log(0); add small epsilon
     norm_base = np.log10(base_mat + 1e-9)
-    sns.heatmap(norm_base, annot=False, cmap='magma', xticklabels=sizes, yticklabels=[f'deg={d:g}' for d in degrees], ax=ax)
+    _heatmap(ax, norm_base, 'magma', sizes, [f'deg={d:g}' for d in degrees])
     ax.set_xlabel('n'); ax.set_ylabel('avg_degree'); ax.set_title('Baseline time log10(ms)')
-    fig.tight_layout(); fig.savefig(f'{out_prefix}_heatmap_baseline.png', dpi=130); plt.close(fig)
+    fig.tight_layout(); fig.savefig(f'{out_prefix}_heatmap_baseline.png', dpi=130)
 
 
 def main():
@@ -164,6 +164,76 @@ pub extern "C" fn sssp_run_baseline(
     0
 }
 
+// Same as sssp_run_baseline, but dist/pred are allocated by the library instead
+// of the caller: on success *out_dist / *out_pred point at Rust-owned arrays of
+// length n, which must be released with sssp_free(dist, pred, n).
+#[no_mangle]
+pub extern "C" fn sssp_run_baseline_alloc(
+    n: u32,
+    offsets: *const u32,
+    targets: *const u32,
+    weights: *const f32,
+    source: u32,
+    out_dist: *mut *mut f32,
+    out_pred: *mut *mut i32,
+    info: *mut SsspResultInfo,
+) -> i32 {
+    if out_dist.is_null() || out_pred.is_null() { return -3; }
+    if n == 0 { return -1; }
+    let n_usize = n as usize;
+    // Zeroed vecs come from alloc_zeroed, so large outputs get lazily zeroed pages.
+    let mut dist: Vec<f32> = vec![0f32; n_usize];
+    let mut pred: Vec<i32> = vec![0i32; n_usize];
+    let rc = sssp_run_baseline(n, offsets, targets, weights, source, dist.as_mut_ptr(), pred.as_mut_ptr(), info);
+    if rc != 0 { return rc; }
+    unsafe {
+        *out_dist = Box::into_raw(dist.into_boxed_slice()) as *mut f32;
+        *out_pred = Box::into_raw(pred.into_boxed_slice()) as *mut i32;
+    }
+    0
+}
+
+// Run the baseline from each of n_srcs sources over one CSR graph. Row k of
+// out_dist/out_pred (row-major, n_srcs x n) and infos[k] receive the result for
+// srcs[k]; infos may be null. Stops at the first failing source and returns its code.
+#[no_mangle]
+pub extern "C" fn sssp_run_baseline_batch(
+    n: u32,
+    offsets: *const u32,
+    targets: *const u32,
+    weights: *const f32,
+    srcs: *const u32,
+    n_srcs: u32,
+    out_dist: *mut f32,
+    out_pred: *mut i32,
+    infos: *mut SsspResultInfo,
+) -> i32 {
+    if n == 0 { return -1; }
+    if n_srcs == 0 { return 0; }
+    if srcs.is_null() || out_dist.is_null() || out_pred.is_null() { return -3; }
+    let n_usize = n as usize;
+    let sources = as_slice(srcs, n_srcs as usize);
+    for (k, &s) in sources.iter().enumerate() {
+        let info = if infos.is_null() { core::ptr::null_mut() } else { unsafe { infos.add(k) } };
+        let rc = unsafe {
+            sssp_run_baseline(n, offsets, targets, weights, s,
+                              out_dist.add(k * n_usize), out_pred.add(k * n_usize), info)
+        };
+        if rc != 0 { return rc; }
+    }
+    0
+}
+
+// Release buffers returned by sssp_run_baseline_alloc; null pointers are ignored.
+#[no_mangle]
+pub extern "C" fn sssp_free(dist: *mut f32, pred: *mut i32, n: u32) {
+    let n_usize = n as usize;
+    unsafe {
+        if !dist.is_null() { drop(Box::from_raw(core::ptr::slice_from_raw_parts_mut(dist, n_usize))); }
+        if !pred.is_null() { drop(Box::from_raw(core::ptr::slice_from_raw_parts_mut(pred, n_usize))); }
+    }
+}
+
 #[no_mangle]
 pub extern "C" fn sssp_version() -> u32 { 4 } // incremented due to SsspResultInfo breaking change
 
@@ -460,6 +530,47 @@ pub extern "C" fn sssp_run_stoc_autotune(
     out_dist: *mut f32,
     out_pred: *mut i32,
     info: *mut SsspResultInfo,
+) -> i32 {
+    let candidates = parse_autotune_set();
+    let limit: u32 = std::env::var("SSSP_STOC_AUTOTUNE_LIMIT").ok().and_then(|v| v.parse().ok()).unwrap_or(2048);
+    stoc_autotune_run(n, offsets, targets, weights, source, out_dist, out_pred, info, candidates, limit)
+}
+
+// Same as sssp_run_stoc_autotune but with the candidate multipliers and the
+// truncation limit passed explicitly instead of read from the environment.
+// A null/empty set or a zero limit falls back to the env/default value.
+#[no_mangle]
+pub extern "C" fn sssp_run_stoc_autotune_ex(
+    n: u32,
+    offsets: *const u32,
+    targets: *const u32,
+    weights: *const f32,
+    source: u32,
+    out_dist: *mut f32,
+    out_pred: *mut i32,
+    info: *mut SsspResultInfo,
+    autotune_set: *const f32,
+    autotune_set_len: u32,
+    autotune_limit: u32,
+) -> i32 {
+    let candidates: Vec<f32> = if autotune_set.is_null() || autotune_set_len == 0 { parse_autotune_set() }
+        else { as_slice(autotune_set, autotune_set_len as usize).iter().copied().filter(|x| *x > 0.0).collect() };
+    let limit: u32 = if autotune_limit > 0 { autotune_limit }
+        else { std::env::var("SSSP_STOC_AUTOTUNE_LIMIT").ok().and_then(|v| v.parse().ok()).unwrap_or(2048) };
+    stoc_autotune_run(n, offsets, targets, weights, source, out_dist, out_pred, info, candidates, limit)
+}
+
+fn stoc_autotune_run(
+    n: u32,
+    offsets: *const u32,
+    targets: *const u32,
+    weights: *const f32,
+    source: u32,
+    out_dist: *mut f32,
+    out_pred: *mut i32,
+    info: *mut SsspResultInfo,
+    mut candidates: Vec<f32>,
+    limit: u32,
 ) -> i32 {
     if n == 0 { return -1; }
     if source >= n { return -2; }
@@ -467,8 +578,8 @@ pub extern "C" fn sssp_run_stoc_autotune(
     let n_usize = n as usize; let off = as_slice(offsets, n_usize + 1); let m = match off.last() { Some(v) => *v as usize, None => return -4 }; let tgt = as_slice(targets, m); let wts = as_slice(weights, m);
     let dist = as_mut_slice(out_dist, n_usize); let pred = as_mut_slice(out_pred, n_usize);
     let sample = core::cmp::min(1000, m); let avg = derive_avg_weight(sample, wts);
-    let candidates = { let mut c = parse_autotune_set(); if c.is_empty() { c.push(3.0); } c };
-    let limit: u32 = std::env::var("SSSP_STOC_AUTOTUNE_LIMIT").ok().and_then(|v| v.parse().ok()).unwrap_or(2048).min(n);
+    if candidates.is_empty() { candidates.push(3.0); }
+    let limit = limit.min(n);
     let mut best_mult = candidates[0]; let mut best_time = f64::INFINITY;
     let mut tmp_dist = vec![0f32; n_usize]; let mut tmp_pred = vec![0i32; n_usize];
     for &mult in &candidates { let delta = (avg * mult).clamp(0.0001, 1e6); let start = Instant::now(); let (_r,_l,_h,_s,err) = stoc_run_internal(n, off, tgt, wts, source, delta, &mut tmp_dist, &mut tmp_pred, Some(limit)); if err != 0 { continue; } let elapsed = start.elapsed().as_secs_f64(); if elapsed < best_time { best_time = elapsed; best_mult = mult; } }
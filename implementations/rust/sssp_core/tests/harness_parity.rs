@@ -1,5 +1,5 @@
 use sssp_core::{
-    sssp_run_baseline, sssp_run_spec_phase1, sssp_run_spec_phase2, sssp_run_spec_phase3, sssp_run_spec_boundary_chain,
+    sssp_run_baseline, sssp_run_baseline_alloc, sssp_run_baseline_batch, sssp_free, sssp_run_stoc_autotune_ex, sssp_run_spec_phase1, sssp_run_spec_phase2, sssp_run_spec_phase3, sssp_run_spec_boundary_chain,
     SsspResultInfo,
 };
 
@@ -134,3 +134,59 @@ fn parity_random_graphs(){
         for variant in ["phase1","phase2","phase3","chain"] { let (dist,_p,_i) = run_variant(variant,&g,0); assert_parity(&bdist,&dist,1e-4); let h = hash_dist(&dist); assert_eq!(bhash,h, "hash mismatch variant {} seed {}", variant, seed); }
     }
 }
+
+#[test]
+fn baseline_alloc_matches_baseline(){
+    let g = bridge_cliques(5,7,1.5);
+    let (bdist,bpred,_binfo) = run_variant("baseline", &g, 0);
+    let mut info = SsspResultInfo { relaxations:0, light_relaxations:0, heavy_relaxations:0, settled:0, error_code:0 };
+    let mut dptr: *mut f32 = std::ptr::null_mut(); let mut pptr: *mut i32 = std::ptr::null_mut();
+    let rc = sssp_run_baseline_alloc(g.n, g.offsets.as_ptr(), g.targets.as_ptr(), g.weights.as_ptr(), 0, &mut dptr, &mut pptr, &mut info as *mut _);
+    assert_eq!(rc,0);
+    let (dist,pred) = unsafe { (std::slice::from_raw_parts(dptr, g.n as usize).to_vec(), std::slice::from_raw_parts(pptr, g.n as usize).to_vec()) };
+    sssp_free(dptr, pptr, g.n);
+    assert_parity(&bdist,&dist,0.0);
+    assert_eq!(bpred,pred);
+}
+
+#[test]
+fn baseline_batch_matches_per_source(){
+    let g = bridge_cliques(5,7,1.5);
+    let n = g.n as usize;
+    let srcs: Vec<u32> = vec![0, 3, g.n-1];
+    let mut dist = vec![0f32; srcs.len()*n]; let mut pred = vec![0i32; srcs.len()*n];
+    let mut infos: Vec<SsspResultInfo> = srcs.iter().map(|_| SsspResultInfo { relaxations:0, light_relaxations:0, heavy_relaxations:0, settled:0, error_code:0 }).collect();
+    let rc = sssp_run_baseline_batch(g.n, g.offsets.as_ptr(), g.targets.as_ptr(), g.weights.as_ptr(), srcs.as_ptr(), srcs.len() as u32, dist.as_mut_ptr(), pred.as_mut_ptr(), infos.as_mut_ptr());
+    assert_eq!(rc,0);
+    for (k,&s) in srcs.iter().enumerate() {
+        let (bdist,bpred,binfo) = run_variant("baseline", &g, s);
+        assert_parity(&bdist,&dist[k*n..(k+1)*n],0.0);
+        assert_eq!(&bpred[..],&pred[k*n..(k+1)*n]);
+        assert_eq!(binfo.relaxations, infos[k].relaxations);
+    }
+    let bad = [0u32, g.n];
+    let rc = sssp_run_baseline_batch(g.n, g.offsets.as_ptr(), g.targets.as_ptr(), g.weights.as_ptr(), bad.as_ptr(), 2, dist.as_mut_ptr(), pred.as_mut_ptr(), std::ptr::null_mut());
+    assert_eq!(rc,-2);
+}
+
+#[test]
+fn stoc_autotune_ex_matches_baseline(){
+    let g = bridge_cliques(5,7,1.5);
+    let (bdist,_bpred,_binfo) = run_variant("baseline", &g, 0);
+    let run = |set: &[f32], set_ptr: *const f32, limit: u32| {
+        let mut dist = vec![0f32; g.n as usize]; let mut pred = vec![-1i32; g.n as usize];
+        let mut info = SsspResultInfo { relaxations:0, light_relaxations:0, heavy_relaxations:0, settled:0, error_code:0 };
+        let rc = sssp_run_stoc_autotune_ex(g.n, g.offsets.as_ptr(), g.targets.as_ptr(), g.weights.as_ptr(), 0, dist.as_mut_ptr(), pred.as_mut_ptr(), &mut info as *mut _, set_ptr, set.len() as u32, limit);
+        assert_eq!(rc,0, "autotune_ex set={:?} limit={} returned rc {}", set, limit, rc);
+        dist
+    };
+    let explicit = [1.5f32, 4.0];
+    assert_parity(&bdist, &run(&explicit, explicit.as_ptr(), 16), 1e-5);
+    // Fallbacks: null / empty set -> default set, limit 0 -> default limit, all non-positive -> [3.0]
+    assert_parity(&bdist, &run(&[], std::ptr::null(), 16), 1e-5);
+    let empty: [f32; 0] = [];
+    assert_parity(&bdist, &run(&empty, empty.as_ptr(), 16), 1e-5);
+    assert_parity(&bdist, &run(&explicit, explicit.as_ptr(), 0), 1e-5);
+    let non_pos = [0.0f32, -2.0];
+    assert_parity(&bdist, &run(&non_pos, non_pos.as_ptr(), 16), 1e-5);
+}